@@ -2,16 +2,28 @@
 """Модуль для работы с настройками игры."""
 import json
 import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import pygame
+from utils.asset_manager import asset_manager, FORMAT_OPAQUE, FORMAT_ALPHA, FIT_COVER, DEFAULT_MEMORY_BUDGET_MB
+from utils.log import log
+from utils.sound_manager import sound_manager, GROUP_SFX, GROUP_MUSIC
+from utils.music_service import music_service, DEFAULT_CROSSFADE_MS
 
 # --- Константы путей к медиафайлам ---
 MAIN_MENU_MUSIC_FILE = "assets/main_menu.mp3"
+GAME_MUSIC_FILE = "assets/game_music.mp3" # Музыка самой игры (после создания персонажа)
 BUTTON_SOUND_FILE = "assets/button_sound.mp3"
 MAIN_MENU_BACKGROUND_FILE = "assets/mainpage_image.png"
 SPLASH_IMAGE_FILE = "assets/zastavka.png"
 SPLASH_VIDEO_FILE = "assets/zastavka.mp4"
 # Путь к папке с изображениями путей
 PATH_IMAGES_FOLDER = "assets/path_images" # <-- Новая константа
+PATH_IMAGE_EXTENSIONS = ['.png', '.jpg', '.jpeg']
+# Архив с заранее декодированными изображениями (собирается tools/pack_assets.py)
+ASSET_ARCHIVE_FILE = "assets/assets.pak"
 
 # --- Константы по умолчанию ---
 try:
@@ -29,44 +41,152 @@ DEFAULT_SETTINGS = {
     "language": "ru",
     "music_volume": 0.5, # 50% для музыки
     "sfx_volume": 0.7,   # 70% для звуковых эффектов
+    "music_crossfade_ms": DEFAULT_CROSSFADE_MS, # Длительность плавной смены музыки между сценами
+    "dirty_rects": False, # Перерисовывать только изменившиеся области экрана
+    "idle_mode": True,    # Не перерисовывать экран, пока ничего не меняется (ждать событий)
+    "asset_memory_budget_mb": DEFAULT_MEMORY_BUDGET_MB, # Бюджет памяти кэша изображений и звуков
 }
 SETTINGS_FILE = "settings.json"
+SAVE_DEBOUNCE_SECONDS = 0.5 # Серия изменений сохраняется одной записью после паузы
 
 COMMON_RESOLUTIONS = [
     (1280, 720), (1366, 768), (1440, 900), (1600, 900),
     (1680, 1050), (1920, 1080), (2560, 1440), (3840, 2160),
 ]
 
+def write_settings_file(data, file_path=SETTINGS_FILE):
+    """Атомарно записывает настройки: временный файл в той же папке, затем os.replace."""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    try:
+        fd, temp_path = tempfile.mkstemp(prefix=".settings-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp создает файл с правами 0600 - сохраняем права прежнего файла
+            mode = os.stat(file_path).st_mode & 0o777 if os.path.exists(file_path) else 0o644
+            os.chmod(temp_path, mode)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    except OSError as e:
+        log.error("settings", "Ошибка сохранения настроек: %s", e)
+
+class SettingsStore(dict):
+    """
+    Настройки игры. Запоминает измененные ключи и записывает файл не сразу,
+    а после короткой паузы (одна запись на серию изменений), в фоновом потоке
+    через временный файл и os.replace, чтобы файл не оказался недописанным.
+    """
+
+    def __init__(self, values, file_path=SETTINGS_FILE, debounce=SAVE_DEBOUNCE_SECONDS):
+        super().__init__(values)
+        self.file_path = file_path
+        self.debounce = debounce
+        self.dirty_keys = set()
+        self._last_change = 0.0
+        self._lock = threading.Lock() # Одновременно идет только одна запись файла
+        self._executor = None
+        self._pending_write = None
+
+    def __setitem__(self, key, value):
+        if key in self and self[key] == value:
+            return
+        super().__setitem__(key, value)
+        self.mark_dirty(key)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.mark_dirty(key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def mark_dirty(self, key=None):
+        """Помечает ключ (или все настройки) как требующие сохранения."""
+        self.dirty_keys.update([key] if key is not None else self.keys())
+        self._last_change = time.monotonic()
+
+    @property
+    def is_dirty(self):
+        return bool(self.dirty_keys)
+
+    def _snapshot(self):
+        """Забирает текущие значения для записи и сбрасывает список изменений."""
+        self.dirty_keys.clear()
+        data = dict(self)
+        data["fullscreen"] = True
+        return data
+
+    def _write(self, data):
+        with self._lock:
+            write_settings_file(data, self.file_path)
+
+    def poll(self):
+        """
+        Вызывается каждый кадр: если изменения затихли дольше паузы,
+        запускает запись в фоновом потоке. Ничего не делает, пока изменений нет.
+        """
+        if not self.dirty_keys or time.monotonic() - self._last_change < self.debounce:
+            return
+        if self._pending_write is not None and not self._pending_write.done():
+            return # Дождемся предыдущей записи, изменения подхватим следующей
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="settings")
+        self._pending_write = self._executor.submit(self._write, self._snapshot())
+
+    def flush(self):
+        """Синхронно дописывает все изменения (при выходе из игры)."""
+        if self._pending_write is not None:
+            self._pending_write.result()
+            self._pending_write = None
+        if self.dirty_keys:
+            self._write(self._snapshot())
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
 def load_settings():
     """Загружает настройки из файла или возвращает значения по умолчанию."""
     if os.path.exists(SETTINGS_FILE):
         try:
             with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
-                settings = json.load(f)
+                settings = SettingsStore(json.load(f))
                 for key, default_value in DEFAULT_SETTINGS.items():
                     if key not in settings:
                         settings[key] = default_value
                 settings["fullscreen"] = True
                 return settings
         except (json.JSONDecodeError, IOError, Exception) as e:
-            print(f"Ошибка загрузки настроек: {e}. Используются настройки по умолчанию.")
-            default_copy = DEFAULT_SETTINGS.copy()
+            log.warning("settings", "Ошибка загрузки настроек: %s. Используются настройки по умолчанию.", e)
+            default_copy = SettingsStore(DEFAULT_SETTINGS)
             default_copy["fullscreen"] = True
             return default_copy
     else:
-        default_copy = DEFAULT_SETTINGS.copy()
+        default_copy = SettingsStore(DEFAULT_SETTINGS)
         default_copy["fullscreen"] = True
-        save_settings(default_copy)
+        # Файл будет записан вместе с первыми изменениями (или при выходе)
+        default_copy.mark_dirty()
         return default_copy
 
 def save_settings(settings):
-    """Сохраняет настройки в файл."""
+    """
+    Сохраняет настройки. Для SettingsStore только помечает их к записи
+    (запись произойдет в settings.poll() или settings.flush()).
+    """
+    if isinstance(settings, SettingsStore):
+        settings.mark_dirty()
+        return
     settings["fullscreen"] = True
-    try:
-        with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(settings, f, indent=4)
-    except IOError as e:
-        print(f"Ошибка сохранения настроек: {e}")
+    write_settings_file(settings)
 
 def set_display_mode(settings):
     """Устанавливает режим отображения на основе настроек (всегда полноэкранный)."""
@@ -75,19 +195,19 @@ def set_display_mode(settings):
         screen = pygame.display.set_mode((settings["screen_width"], settings["screen_height"]), flags)
         return screen
     except pygame.error as e:
-        print(f"Не удалось установить режим отображения с SCALED: {e}. Пробуем обычный FULLSCREEN.")
+        log.warning("display", "Не удалось установить режим отображения с SCALED: %s. Пробуем обычный FULLSCREEN.", e)
         flags = pygame.FULLSCREEN
         try:
             screen = pygame.display.set_mode((settings["screen_width"], settings["screen_height"]), flags)
             return screen
         except pygame.error as e2:
-            print(f"Не удалось установить полноэкранный режим: {e2}")
+            log.warning("display", "Не удалось установить полноэкранный режим: %s", e2)
             try:
                 screen = pygame.display.set_mode((settings["screen_width"], settings["screen_height"]))
-                print("Запуск в оконном режиме из-за ошибки установки полноэкранного режима.")
+                log.warning("display", "Запуск в оконном режиме из-за ошибки установки полноэкранного режима.")
                 return screen
             except pygame.error as e3:
-                print(f"Критическая ошибка инициализации дисплея: {e3}")
+                log.error("display", "Критическая ошибка инициализации дисплея: %s", e3)
                 raise
 
 def apply_display_settings(screen, settings):
@@ -97,13 +217,13 @@ def apply_display_settings(screen, settings):
         new_screen = pygame.display.set_mode((settings["screen_width"], settings["screen_height"]), flags)
         return new_screen
     except pygame.error as e:
-        print(f"Не удалось применить настройки отображения: {e}")
+        log.warning("display", "Не удалось применить настройки отображения: %s", e)
         flags = pygame.FULLSCREEN
         try:
             new_screen = pygame.display.set_mode((settings["screen_width"], settings["screen_height"]), flags)
             return new_screen
         except pygame.error as e2:
-            print(f"Не удалось применить настройки отображения даже без SCALED: {e2}")
+            log.error("display", "Не удалось применить настройки отображения даже без SCALED: %s", e2)
             return screen
 
 def get_common_resolutions(current_width, current_height):
@@ -117,52 +237,61 @@ def get_common_resolutions(current_width, current_height):
 
 def apply_volume_settings(settings):
     """Применяет настройки громкости ко всем аудио компонентам."""
-    # Устанавливаем громкость для музыки
-    pygame.mixer.music.set_volume(settings["music_volume"])
-    # Громкость для звуков будет устанавливаться при их воспроизведении
-    # или через глобальный механизм, если он будет добавлен
+    # Устанавливаем громкость для музыки (каналы music_service)
+    music_service.set_volume(settings["music_volume"])
+    # Громкость звуков задается группами каналов, сами звуки не меняются
+    sound_manager.set_group_volume(GROUP_MUSIC, settings["music_volume"])
+    sound_manager.set_group_volume(GROUP_SFX, settings["sfx_volume"])
 
 # --- Функции для загрузки медиафайлов ---
 def load_main_menu_background(screen_width, screen_height):
     """Загружает и масштабирует фоновое изображение главного меню в режиме 'cover'."""
     try:
         if os.path.exists(MAIN_MENU_BACKGROUND_FILE):
-            background = pygame.image.load(MAIN_MENU_BACKGROUND_FILE).convert()
-            img_w, img_h = background.get_size()
-            
-            # Рассчитываем коэффициенты масштабирования
-            scale_w = screen_width / img_w
-            scale_h = screen_height / img_h
-            
-            # Выбираем больший коэффициент, чтобы изображение покрывало весь экран
-            scale_factor = max(scale_w, scale_h)
-
-            # Новые размеры изображения
-            new_w = int(img_w * scale_factor)
-            new_h = int(img_h * scale_factor)
-
-            # Масштабируем изображение
-            scaled_background = pygame.transform.smoothscale(background, (new_w, new_h))
-            return scaled_background
+            # Менеджер ресурсов масштабирует изображение так, чтобы оно покрывало весь экран,
+            # и кэширует результат для этого разрешения
+            return asset_manager.load_image(MAIN_MENU_BACKGROUND_FILE, (screen_width, screen_height),
+                                            FORMAT_OPAQUE, fit=FIT_COVER)
         else:
-            print(f"Файл фонового изображения '{MAIN_MENU_BACKGROUND_FILE}' не найден.")
+            log.warning("assets", "Файл фонового изображения '%s' не найден.", MAIN_MENU_BACKGROUND_FILE)
             return None
     except pygame.error as e:
-        print(f"Ошибка загрузки фонового изображения '{MAIN_MENU_BACKGROUND_FILE}': {e}")
+        log.error("assets", "Ошибка загрузки фонового изображения '%s': %s", MAIN_MENU_BACKGROUND_FILE, e)
         return None
 
 def load_button_sound():
     """Загружает звук нажатия кнопки."""
     try:
         if os.path.exists(BUTTON_SOUND_FILE):
-            button_sound = pygame.mixer.Sound(BUTTON_SOUND_FILE)
-            return button_sound
+            return asset_manager.load_sound(BUTTON_SOUND_FILE)
         else:
-            print(f"Файл звука кнопки '{BUTTON_SOUND_FILE}' не найден.")
+            log.warning("assets", "Файл звука кнопки '%s' не найден.", BUTTON_SOUND_FILE)
             return None
     except pygame.error as e:
-        print(f"Ошибка загрузки звука кнопки '{BUTTON_SOUND_FILE}': {e}")
+        log.error("assets", "Ошибка загрузки звука кнопки '%s': %s", BUTTON_SOUND_FILE, e)
         return None
 
-# Функция для загрузки изображений путей будет в character_creation.py
-# так как она требует доступа к screen и settings во время выполнения
+def find_path_image_file(path_id):
+    """Ищет файл изображения пути с одним из поддерживаемых расширений."""
+    for ext in PATH_IMAGE_EXTENSIONS:
+        image_path = os.path.join(PATH_IMAGES_FOLDER, f"{path_id}{ext}")
+        if os.path.exists(image_path):
+            return image_path
+    return None
+
+def preload_media(screen_width, screen_height, path_ids=()):
+    """
+    Запускает фоновую загрузку тяжелых медиафайлов (пока показывается заставка).
+    В главном потоке потом выполняется только convert() в asset_manager.poll().
+    """
+    if os.path.exists(MAIN_MENU_BACKGROUND_FILE):
+        asset_manager.preload_image(MAIN_MENU_BACKGROUND_FILE, (screen_width, screen_height),
+                                    FORMAT_OPAQUE, fit=FIT_COVER)
+    if os.path.exists(BUTTON_SOUND_FILE):
+        asset_manager.preload_sound(BUTTON_SOUND_FILE)
+    for path_id in path_ids:
+        image_path = find_path_image_file(path_id)
+        if image_path:
+            asset_manager.preload_image(image_path, pixel_format=FORMAT_ALPHA)
+
+# Изображения путей подгружаются лениво в character_creation.py
@@ -3,22 +3,29 @@
 
 import pygame
 from ui.button import Button
-from data.localization import get_text
+from ui.text_cache import render_text
+from ui.fonts import get_font
+from ui.hit_grid import HitGrid
+from game_states.scene import Scene
+from data.localization import get_catalog, subscribe_language_changed
 
-class MainMenu:
+class MainMenu(Scene):
     def __init__(self, screen, settings, on_new_game, on_load_game, on_settings, on_exit):
-        self.screen = screen
-        self.settings = settings
+        super().__init__(screen, settings)
+        self.texts = get_catalog(settings["language"]) # Каталог текстов активного языка
         self.on_new_game = on_new_game
         self.on_load_game = on_load_game
         self.on_settings = on_settings
         self.on_exit = on_exit
 
-        self.font_title = pygame.font.SysFont(None, 60)
-        self.font_button = pygame.font.SysFont(None, 36)
+        self.font_title = get_font(60)
+        self.font_button = get_font(36)
 
         self.buttons = []
+        self.hit_grid = HitGrid() # Поиск кнопки под курсором
         self._create_buttons()
+        # При смене языка меняются только надписи, кнопки не пересоздаются
+        subscribe_language_changed(self.on_language_changed)
 
     def _create_buttons(self):
         self.buttons = []
@@ -37,39 +44,46 @@ class MainMenu:
 
         for i, item in enumerate(main_menu_items):
             button_y = main_menu_start_y + i * main_menu_spacing
-            button_text = get_text(self.settings, item["text_key"])
+            button_text = self.texts[item["text_key"]]
             button = Button(main_menu_start_x, button_y, main_menu_width, main_menu_height,
                             button_text, item["color"], item["hover_color"], self.font_button)
             button.action = item["action"] # Сохраняем действие в кнопке
+            button.text_key = item["text_key"] # Ключ текста - для смены языка
             self.buttons.append(button)
+        self.hit_grid.rebuild(self.buttons)
+
+    def on_language_changed(self, catalog):
+        """Перерисовывает надписи на новом языке."""
+        self.texts = catalog
+        for button in self.buttons:
+            button.text = catalog[button.text_key]
+        self.dirty.mark_all()
 
     def handle_event(self, event, mouse_pos):
         """Обрабатывает события, используя button.is_clicked для звука."""
         # Используем button.is_clicked() для обработки кликов и воспроизведения звука
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            for button in self.buttons:
-                # is_clicked проверит попадание и воспроизведет звук
-                if button.is_clicked(mouse_pos, event):
-                    # Если клик был обработан, вызываем action
-                    if hasattr(button, 'action') and button.action:
-                        button.action()
-                    # Обработали клик, выходим из цикла
-                    break
+            button = self.hit_grid.hit(mouse_pos)
+            # is_clicked воспроизведет звук
+            if button and button.is_clicked(mouse_pos, event):
+                # Если клик был обработан, вызываем action
+                if hasattr(button, 'action') and button.action:
+                    button.action()
 
     def update(self, mouse_pos):
-        for button in self.buttons:
-            button.check_hover(mouse_pos)
+        for button in self.hit_grid.update_hover(mouse_pos):
+            self.dirty.mark(button.rect)
 
     def draw(self):
         # self.screen.fill((0, 0, 0)) # Убрано, фон рисуется в main.py
 
-        title_text = get_text(self.settings, "title")
-        title_surface = self.font_title.render(title_text, True, (255, 215, 0))
+        title_text = self.texts["title"]
+        title_surface = render_text(self.font_title, title_text, (255, 215, 0))
         title_rect = title_surface.get_rect(center=(self.screen.get_width()//2, 100))
         self.screen.blit(title_surface, title_rect)
         
-        subtitle_text = get_text(self.settings, "main_menu")
-        subtitle_surface = self.font_button.render(subtitle_text, True, (200, 200, 200))
+        subtitle_text = self.texts["main_menu"]
+        subtitle_surface = render_text(self.font_button, subtitle_text, (200, 200, 200))
         subtitle_rect = subtitle_surface.get_rect(center=(self.screen.get_width()//2, 160))
         self.screen.blit(subtitle_surface, subtitle_rect)
 
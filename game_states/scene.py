@@ -0,0 +1,54 @@
+# game_states/scene.py
+"""Модуль с базовым классом сцены."""
+
+from ui.dirty_rects import DirtyRectTracker
+
+class Scene:
+    """
+    Базовый класс сцены. SceneManager вызывает хуки жизненного цикла:
+    enter/exit - сцена становится активной / покидается (здесь освобождаются тяжелые ресурсы),
+    suspend/resume - поверх сцены открыта другая / снова стала верхней.
+    """
+
+    # Рисовать ли под сценой общий фон меню (заставка рисует экран сама)
+    uses_menu_background = True
+
+    def __init__(self, screen, settings):
+        self.screen = screen
+        self.settings = settings
+        # Области экрана, изменившиеся с прошлого кадра
+        self.dirty = DirtyRectTracker()
+
+    # --- Хуки жизненного цикла ---
+    def enter(self):
+        """Сцена стала активной (после создания или после exit)."""
+        self.dirty.mark_all()
+
+    def exit(self):
+        """Сцену покинули: можно освободить тяжелые ресурсы."""
+
+    def suspend(self):
+        """Поверх сцены открыта другая сцена."""
+
+    def resume(self):
+        """Сцена снова стала верхней."""
+        self.dirty.mark_all()
+
+    def set_screen(self, screen):
+        """Обновляет экран (например, после смены разрешения)."""
+        self.screen = screen
+        self.dirty.mark_all()
+
+    def is_animating(self):
+        """Меняется ли сцена сама по себе (без ввода). Такие сцены рисуются каждый кадр."""
+        return False
+
+    # --- Основной цикл ---
+    def handle_event(self, event, mouse_pos):
+        """Обрабатывает событие."""
+
+    def update(self, mouse_pos):
+        """Обновляет состояние сцены."""
+
+    def draw(self):
+        """Отрисовывает сцену."""
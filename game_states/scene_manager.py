@@ -0,0 +1,96 @@
+# game_states/scene_manager.py
+"""Модуль для управления стеком сцен."""
+
+class SceneManager:
+    """
+    Стек сцен. Сцены регистрируются по id фабрикой и создаются при первом входе.
+    Основной цикл обращается только к верхней сцене - по одному вызову на фазу.
+    """
+
+    def __init__(self):
+        self._factories = {} # id -> (фабрика, хранить ли сцену после выхода)
+        self._scenes = {}    # id -> созданная сцена
+        self._stack = []     # id сцен, верхняя - активная
+
+    def register(self, scene_id, factory, keep_alive=True):
+        """
+        Регистрирует сцену. factory() вызывается при первом входе в сцену.
+        Если keep_alive=False, сцена удаляется после выхода (например, заставка).
+        """
+        self._factories[scene_id] = (factory, keep_alive)
+
+    def get(self, scene_id):
+        """Возвращает сцену, создавая её при необходимости."""
+        scene = self._scenes.get(scene_id)
+        if scene is None:
+            factory, _ = self._factories[scene_id]
+            scene = factory()
+            self._scenes[scene_id] = scene
+        return scene
+
+    @property
+    def current_id(self):
+        return self._stack[-1] if self._stack else None
+
+    @property
+    def current(self):
+        """Активная (верхняя) сцена или None."""
+        return self._scenes.get(self._stack[-1]) if self._stack else None
+
+    @property
+    def depth(self):
+        return len(self._stack)
+
+    def _exit(self, scene_id):
+        scene = self._scenes.get(scene_id)
+        if scene is None:
+            return
+        scene.exit()
+        if not self._factories[scene_id][1] and scene_id not in self._stack:
+            # Сцена больше не нужна - отпускаем её вместе со всеми ресурсами
+            del self._scenes[scene_id]
+
+    def switch(self, scene_id):
+        """Заменяет верхнюю сцену."""
+        old_id = self._stack.pop() if self._stack else None
+        self._stack.append(scene_id)
+        if old_id is not None and old_id != scene_id:
+            self._exit(old_id)
+        self.get(scene_id).enter()
+
+    def push(self, scene_id):
+        """Открывает сцену поверх текущей (текущая приостанавливается)."""
+        if self.current is not None:
+            self.current.suspend()
+        self._stack.append(scene_id)
+        self.get(scene_id).enter()
+
+    def pop(self):
+        """Закрывает верхнюю сцену и возвращает управление предыдущей."""
+        if not self._stack:
+            return
+        old_id = self._stack.pop()
+        self._exit(old_id)
+        if self.current is not None:
+            self.current.resume()
+
+    def set_screen(self, screen):
+        """Передает новый экран всем уже созданным сценам."""
+        for scene in self._scenes.values():
+            scene.set_screen(screen)
+
+    # --- Диспетчеризация к активной сцене ---
+    def handle_event(self, event, mouse_pos):
+        scene = self.current
+        if scene is not None:
+            scene.handle_event(event, mouse_pos)
+
+    def update(self, mouse_pos):
+        scene = self.current
+        if scene is not None:
+            scene.update(mouse_pos)
+
+    def draw(self):
+        scene = self.current
+        if scene is not None:
+            scene.draw()
@@ -3,27 +3,39 @@
 
 import pygame
 from ui.button import Button
-from data.localization import get_text
-
-class SettingsMenu:
-    def __init__(self, screen, settings, on_back):
-        self.screen = screen
-        self.settings = settings
+from ui.slider import Slider
+from ui.text_cache import render_text
+from ui.fonts import get_font
+from ui.hit_grid import HitGrid
+from game_states.scene import Scene
+from data.localization import get_catalog, set_language, subscribe_language_changed
+from utils.log import log
+
+VOLUME_TEXT_COLOR = (255, 255, 255)
+# Индикатор громкости -> настройка, значение которой он показывает
+VOLUME_INDICATORS = {"music_display": "music_volume", "sfx_display": "sfx_volume"}
+
+class SettingsMenu(Scene):
+    def __init__(self, screen, settings, on_back, on_change=None):
+        super().__init__(screen, settings)
+        self.texts = get_catalog(settings["language"]) # Каталог текстов активного языка
         self.on_back = on_back
+        # Вызывается с ключом измененной настройки: "language", "music_volume", "sfx_volume"
+        self.on_change = on_change
 
-        self.font_title = pygame.font.SysFont(None, 60)
-        self.font_normal = pygame.font.SysFont(None, 28)
-        self.font_small = pygame.font.SysFont(None, 24)
-
-        # Флаг для main.py, сигнализирующий об изменении.
-        # Возможные значения: None, "language", "music_volume", "sfx_volume"
-        self.pending_change = None
-        # Флаги для отслеживания, нужно ли обновлять конкретные индикаторы
-        self.music_display_dirty = True
-        self.sfx_display_dirty = True
+        self.font_title = get_font(60)
+        self.font_normal = get_font(28)
+        self.font_small = get_font(24)
+        # Надписи "0%".."100%" рендерятся один раз: перетаскивание ползунка только выбирает готовую
+        self._percent_labels = [self.font_normal.render(f"{percent}%", True, VOLUME_TEXT_COLOR)
+                                for percent in range(101)]
 
         self.buttons = []
+        self.sliders = [] # (ключ настройки, Slider)
+        self.hit_grid = HitGrid() # Поиск кнопки или ползунка под курсором
         self._create_buttons()
+        # При смене языка меняются только надписи, кнопки не пересоздаются
+        subscribe_language_changed(self.on_language_changed)
 
     def _create_buttons(self):
         """Создает кнопки меню настроек."""
@@ -36,19 +48,16 @@ class SettingsMenu:
         settings_spacing = 70 # Увеличиваем интервал из-за дополнительных элементов
 
         # Кнопка языка
-        lang_text = f"{get_text(self.settings, 'language')}: {self.settings['language'].upper()}"
         lang_button = Button(settings_start_x, settings_start_y, settings_width, settings_height,
-                             lang_text, (100, 100, 100), (200, 200, 200), self.font_normal, is_toggle=True)
+                             self._get_language_text(), (100, 100, 100), (200, 200, 200), self.font_normal, is_toggle=True)
         lang_button.is_toggled = self.settings["language"] == "en"
         lang_button.action = self._toggle_language
         self.buttons.append(("language", lang_button))
 
         # --- Громкость музыки ---
-        # Перед созданием кнопки обновим её текст, если он "грязный"
-        if self.music_display_dirty:
-            self._update_music_display_text(settings_start_x, settings_start_y + settings_spacing, settings_width, settings_height)
+        # Индикатор - только фон, надпись с процентами рисуется поверх него (_draw_volume_label)
         music_indicator = Button(settings_start_x, settings_start_y + settings_spacing, settings_width, settings_height,
-                                  self._get_music_text(), (100, 100, 100), (100, 100, 100), self.font_normal, text_color=(255, 255, 255), is_toggle=False)
+                                  "", (100, 100, 100), (100, 100, 100), self.font_normal, text_color=VOLUME_TEXT_COLOR, is_toggle=False)
         self.buttons.append(("music_display", music_indicator))
 
         music_up_button = Button(settings_start_x + settings_width - 50, settings_start_y + settings_spacing, 40, settings_height,
@@ -62,11 +71,8 @@ class SettingsMenu:
         self.buttons.append(("music_down", music_down_button))
 
         # --- Громкость звуковых эффектов ---
-        # Перед созданием кнопки обновим её текст, если он "грязный"
-        if self.sfx_display_dirty:
-            self._update_sfx_display_text(settings_start_x, settings_start_y + 2*settings_spacing, settings_width, settings_height)
         sfx_indicator = Button(settings_start_x, settings_start_y + 2*settings_spacing, settings_width, settings_height,
-                                  self._get_sfx_text(), (100, 100, 100), (100, 100, 100), self.font_normal, text_color=(255, 255, 255), is_toggle=False)
+                                  "", (100, 100, 100), (100, 100, 100), self.font_normal, text_color=VOLUME_TEXT_COLOR, is_toggle=False)
         self.buttons.append(("sfx_display", sfx_indicator))
 
         sfx_up_button = Button(settings_start_x + settings_width - 50, settings_start_y + 2*settings_spacing, 40, settings_height,
@@ -81,56 +87,84 @@ class SettingsMenu:
 
         # Кнопка "Назад"
         back_button = Button(50, self.screen.get_height() - 80, 150, 50,
-                             get_text(self.settings, "back"), (100, 100, 100), (200, 200, 200), self.font_normal)
+                             self.texts["back"], (100, 100, 100), (200, 200, 200), self.font_normal)
         back_button.action = self.on_back
         self.buttons.append(("back", back_button))
-        
-        # Сбрасываем флаги "грязности"
-        self.music_display_dirty = False
-        self.sfx_display_dirty = False
 
-    def _get_music_text(self):
-        """Получает текст для индикатора громкости музыки."""
-        return f"{get_text(self.settings, 'music_volume')}: {int(self.settings['music_volume'] * 100)}%"
-
-    def _get_sfx_text(self):
-        """Получает текст для индикатора громкости звуковых эффектов."""
-        return f"{get_text(self.settings, 'sfx_volume')}: {int(self.settings['sfx_volume'] * 100)}%"
-        
-    def _update_music_display_text(self, x, y, width, height):
-        """Обновляет текст кнопки-индикатора громкости музыки."""
-        for i, (key, button) in enumerate(self.buttons):
-            if key == "music_display":
-                button.text = self._get_music_text()
-                button.text_surf = button.font.render(button.text, True, button.text_color)
-                button.text_rect = button.text_surf.get_rect(center=button.rect.center)
-                return
-
-    def _update_sfx_display_text(self, x, y, width, height):
-        """Обновляет текст кнопки-индикатора громкости звуковых эффектов."""
-        for i, (key, button) in enumerate(self.buttons):
-            if key == "sfx_display":
-                button.text = self._get_sfx_text()
-                button.text_surf = button.font.render(button.text, True, button.text_color)
-                button.text_rect = button.text_surf.get_rect(center=button.rect.center)
-                return
+        # Ползунки громкости - под строками с индикаторами
+        self.sliders = []
+        for i, setting_key in enumerate(("music_volume", "sfx_volume")):
+            slider_y = settings_start_y + (i + 1) * settings_spacing + settings_height + 6
+            slider = Slider(settings_start_x + 10, slider_y, settings_width - 20, 16,
+                            self.settings[setting_key],
+                            on_change=lambda value, key=setting_key: self._set_volume(key, value))
+            self.sliders.append((setting_key, slider))
+
+        # Порядок как при отрисовке: кнопки +/- лежат поверх индикаторов
+        self.hit_grid.rebuild([button for _, button in self.buttons] + [slider for _, slider in self.sliders])
+
+    def _get_language_text(self):
+        """Получает текст для кнопки языка."""
+        return f"{self.texts['language']}: {self.settings['language'].upper()}"
+
+    def _draw_volume_label(self, setting_key, rect):
+        """Рисует надпись индикатора громкости: название из кэша текста и готовую надпись с процентами."""
+        prefix = render_text(self.font_normal, f"{self.texts[setting_key]}: ", VOLUME_TEXT_COLOR)
+        percent = self._percent_labels[max(0, min(100, round(self.settings[setting_key] * 100)))]
+        x = rect.centerx - (prefix.get_width() + percent.get_width()) // 2
+        self.screen.blit(prefix, prefix.get_rect(midleft=(x, rect.centery)))
+        self.screen.blit(percent, percent.get_rect(midleft=(x + prefix.get_width(), rect.centery)))
+
+    def _update_volume_display(self, setting_key):
+        """Обновляет индикатор и ползунок одной громкости, не трогая остальные элементы."""
+        for key, button in self.buttons:
+            if VOLUME_INDICATORS.get(key) == setting_key:
+                # Фон индикатора не меняется, надпись перерисуется в draw
+                self.dirty.mark(button.rect)
+        for key, slider in self.sliders:
+            if key == setting_key and slider.set_value(self.settings[setting_key]):
+                self.dirty.mark(slider.rect)
+
+    def _set_volume(self, setting_key, value):
+        """Устанавливает громкость и сообщает, что её нужно применить."""
+        self.settings[setting_key] = value
+        self._update_volume_display(setting_key)
+        self._notify_change(setting_key)
+
+    def _notify_change(self, setting_key):
+        if self.on_change:
+            self.on_change(setting_key)
+
+    def on_language_changed(self, catalog):
+        """Перерисовывает надписи на новом языке."""
+        self.texts = catalog
+        buttons = dict(self.buttons)
+        buttons["language"].text = self._get_language_text()
+        buttons["language"].is_toggled = self.settings["language"] == "en"
+        buttons["back"].text = catalog["back"]
+        self.dirty.mark_all()
 
     def handle_event(self, event, mouse_pos):
         """Обрабатывает события."""
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            for key, button in self.buttons:
-                # Проверяем, есть ли действие у кнопки, и вызываем его
-                if button.rect.collidepoint(mouse_pos) and hasattr(button, 'action') and button.action:
-                    # Выполняем действие
-                    button.action()
-                    # ВАЖНО: Не пересоздаем кнопки здесь. main.py будет решать, что делать.
-                    # Просто выходим после первого совпадения, чтобы не обрабатывать другие кнопки
-                    return 
+            widget = self.hit_grid.hit(mouse_pos)
+            if isinstance(widget, Slider):
+                if widget.handle_event(event):
+                    self.dirty.mark(widget.rect)
+            elif widget is not None and hasattr(widget, 'action') and widget.action:
+                # Выполняем действие
+                widget.action()
+            return
+
+        # Перетаскивание и отпускание получает ползунок, который сейчас тянут
+        for _, slider in self.sliders:
+            if slider.is_dragging and slider.handle_event(event):
+                self.dirty.mark(slider.rect)
 
     def update(self, mouse_pos):
         """Обновляет состояние кнопок."""
-        for _, button in self.buttons:
-            button.check_hover(mouse_pos)
+        for widget in self.hit_grid.update_hover(mouse_pos):
+            self.dirty.mark(widget.rect)
 
     def draw(self):
         """Отрисовывает меню настроек."""
@@ -139,48 +173,43 @@ class SettingsMenu:
 
         screen_width, screen_height = self.screen.get_size()
         
-        title_text = get_text(self.settings, "settings_title")
-        title_surface = self.font_title.render(title_text, True, (255, 215, 0))
+        title_text = self.texts["settings_title"]
+        title_surface = render_text(self.font_title, title_text, (255, 215, 0))
         title_rect = title_surface.get_rect(center=(screen_width//2, 100))
         self.screen.blit(title_surface, title_rect)
 
-        for _, button in self.buttons:
+        for key, button in self.buttons:
             button.draw(self.screen)
+            setting_key = VOLUME_INDICATORS.get(key)
+            if setting_key:
+                # Сразу после фона индикатора, чтобы кнопки +/- остались поверх надписи
+                self._draw_volume_label(setting_key, button.rect)
+        for _, slider in self.sliders:
+            slider.draw(self.screen)
 
     # --- Методы для действий кнопок ---
     def _toggle_language(self):
         """Переключает язык."""
-        self.settings["language"] = "en" if self.settings["language"] == "ru" else "ru"
-        self.pending_change = "language"
+        # Все подписанные сцены (включая эту) обновят надписи сразу
+        set_language(self.settings, "en" if self.settings["language"] == "ru" else "ru")
+        self._notify_change("language")
 
     def _increase_music_volume(self):
         """Увеличивает громкость музыки."""
-        self.settings["music_volume"] = min(1.0, round(self.settings["music_volume"] + 0.1, 1))
-        print(f"Громкость музыки увеличена до: {self.settings['music_volume']}")
-        # Помечаем индикатор как "грязный" для обновления
-        self.music_display_dirty = True
-        self.pending_change = "music_volume"
+        self._set_volume("music_volume", min(1.0, round(self.settings["music_volume"] + 0.1, 1)))
+        log.debug("settings", "Громкость музыки увеличена до: %s", self.settings["music_volume"])
 
     def _decrease_music_volume(self):
         """Уменьшает громкость музыки."""
-        self.settings["music_volume"] = max(0.0, round(self.settings["music_volume"] - 0.1, 1))
-        print(f"Громкость музыки уменьшена до: {self.settings['music_volume']}")
-        # Помечаем индикатор как "грязный" для обновления
-        self.music_display_dirty = True
-        self.pending_change = "music_volume"
+        self._set_volume("music_volume", max(0.0, round(self.settings["music_volume"] - 0.1, 1)))
+        log.debug("settings", "Громкость музыки уменьшена до: %s", self.settings["music_volume"])
 
     def _increase_sfx_volume(self):
         """Увеличивает громкость звуковых эффектов."""
-        self.settings["sfx_volume"] = min(1.0, round(self.settings["sfx_volume"] + 0.1, 1))
-        print(f"Громкость звуков увеличена до: {self.settings['sfx_volume']}")
-        # Помечаем индикатор как "грязный" для обновления
-        self.sfx_display_dirty = True
-        self.pending_change = "sfx_volume"
+        self._set_volume("sfx_volume", min(1.0, round(self.settings["sfx_volume"] + 0.1, 1)))
+        log.debug("settings", "Громкость звуков увеличена до: %s", self.settings["sfx_volume"])
 
     def _decrease_sfx_volume(self):
         """Уменьшает громкость звуковых эффектов."""
-        self.settings["sfx_volume"] = max(0.0, round(self.settings["sfx_volume"] - 0.1, 1))
-        print(f"Громкость звуков уменьшена до: {self.settings['sfx_volume']}")
-        # Помечаем индикатор как "грязный" для обновления
-        self.sfx_display_dirty = True
-        self.pending_change = "sfx_volume"
+        self._set_volume("sfx_volume", max(0.0, round(self.settings["sfx_volume"] - 0.1, 1)))
+        log.debug("settings", "Громкость звуков уменьшена до: %s", self.settings["sfx_volume"])
@@ -3,11 +3,17 @@
 
 import pygame
 import os
+from utils import clock
+from utils.video_decoder import VideoFrameDecoder
+from utils.asset_manager import asset_manager, FORMAT_OPAQUE, FIT_CONTAIN
+from utils.log import log
+from game_states.scene import Scene
 
 # Пути к медиафайлам
 SPLASH_IMAGE_FILE = "assets/zastavka.png" # Или .jpg
 SPLASH_VIDEO_FILE = "assets/zastavka.mp4"
 SPLASH_DURATION = 3000 # 3 секунды в миллисекундах
+VIDEO_BUFFER_FRAMES = 4 # Сколько кадров декодер готовит заранее
 
 # Попытка импорта MoviePy
 try:
@@ -15,31 +21,39 @@ try:
     MOVIEPY_AVAILABLE = True
 except ImportError:
     MOVIEPY_AVAILABLE = False
-    print("MoviePy не найден. Будет использована статичная заставка.")
+    log.info("splash", "MoviePy не найден. Будет использована статичная заставка.")
+
+class SplashScreen(Scene):
+    # Заставка сама заполняет экран
+    uses_menu_background = False
 
-class SplashScreen:
     def __init__(self, screen, settings, on_finish):
-        self.screen = screen
-        self.settings = settings
+        super().__init__(screen, settings)
         self.on_finish = on_finish # Callback при завершении заставки
 
         self.state = "loading" # "loading", "video", "image", "finished"
-        self.start_time = pygame.time.get_ticks()
+        self.start_time = clock.get_ticks()
         
         # --- Загрузка медиа ---
         self.splash_clip = None
         self.splash_surface = None
+        # Статичная заставка, уже вписанная в экран (пересоздается при смене экрана)
+        self.scaled_splash_surface = None
+        self.video_decoder = None
+        self.video_screen_size = None
         
         if MOVIEPY_AVAILABLE:
             try:
                 if os.path.exists(SPLASH_VIDEO_FILE):
                     self.splash_clip = VideoFileClip(SPLASH_VIDEO_FILE)
                     self.state = "video"
-                    print(f"Видео заставка '{SPLASH_VIDEO_FILE}' загружена.")
+                    # Декодер начинает готовить кадры сразу, до первой отрисовки
+                    self._start_video_decoder()
+                    log.info("splash", "Видео заставка '%s' загружена.", SPLASH_VIDEO_FILE)
                 else:
                     raise FileNotFoundError(f"Видео файл {SPLASH_VIDEO_FILE} не найден.")
             except Exception as e:
-                print(f"Не удалось загрузить видео заставку '{SPLASH_VIDEO_FILE}': {e}")
+                log.warning("splash", "Не удалось загрузить видео заставку '%s': %s", SPLASH_VIDEO_FILE, e)
                 self._load_static_image()
         else:
             self._load_static_image()
@@ -48,15 +62,51 @@ class SplashScreen:
         """Загружает статическое изображение заставки."""
         try:
             if os.path.exists(SPLASH_IMAGE_FILE):
-                self.splash_surface = pygame.image.load(SPLASH_IMAGE_FILE).convert()
+                self.splash_surface = asset_manager.load_image(SPLASH_IMAGE_FILE, pixel_format=FORMAT_OPAQUE)
                 self.state = "image"
-                print(f"Загружена статичная заставка '{SPLASH_IMAGE_FILE}'.")
+                log.info("splash", "Загружена статичная заставка '%s'.", SPLASH_IMAGE_FILE)
             else:
                 raise FileNotFoundError(f"Изображение {SPLASH_IMAGE_FILE} не найдено.")
         except (pygame.error, FileNotFoundError) as e:
-            print(f"Не удалось загрузить изображение заставки '{SPLASH_IMAGE_FILE}': {e}")
+            log.warning("splash", "Не удалось загрузить изображение заставки '%s': %s", SPLASH_IMAGE_FILE, e)
             self.state = "finished" # Пропускаем заставку
 
+    def _start_video_decoder(self, elapsed_ms=0):
+        """Запускает фоновый декодер кадров под текущий размер экрана."""
+        if self.video_decoder:
+            self.video_decoder.stop()
+        # Масштабируем под экран, сохраняя пропорции
+        screen_w, screen_h = self.screen.get_size()
+        self.video_screen_size = (screen_w, screen_h)
+        img_w, img_h = self.splash_clip.size
+        scale = min(screen_w / img_w, screen_h / img_h)
+        target_size = (int(img_w * scale), int(img_h * scale))
+        self.video_decoder = VideoFrameDecoder(self.splash_clip, target_size, VIDEO_BUFFER_FRAMES)
+        self.video_decoder.start(elapsed_ms)
+
+    def _build_scaled_splash(self):
+        """Один раз вписывает изображение в экран с черными полями и переводит в формат дисплея."""
+        screen_w, screen_h = self.screen.get_size()
+        # Масштабируем изображение под экран, сохраняя пропорции
+        # (из архива ресурсов может прийти уже отмасштабированный вариант)
+        scaled_image = asset_manager.load_image(SPLASH_IMAGE_FILE, (screen_w, screen_h),
+                                                FORMAT_OPAQUE, fit=FIT_CONTAIN)
+
+        letterboxed = pygame.Surface((screen_w, screen_h)).convert()
+        letterboxed.fill((0, 0, 0))
+        letterboxed.blit(scaled_image, scaled_image.get_rect(center=(screen_w//2, screen_h//2)))
+        self.scaled_splash_surface = letterboxed
+
+    def set_screen(self, screen):
+        """Обновляет экран (например, после смены разрешения)."""
+        super().set_screen(screen)
+        # Заставка будет заново вписана в новый экран при следующей отрисовке
+        self.scaled_splash_surface = None
+
+    def is_animating(self):
+        """Заставка идет по времени, даже если игрок ничего не нажимает."""
+        return self.state != "finished"
+
     def handle_event(self, event, mouse_pos):
         """Обрабатывает события."""
         if self.state != "finished":
@@ -69,7 +119,10 @@ class SplashScreen:
         if self.state == "finished":
             return # Ничего не делаем, если уже завершено
 
-        current_time = pygame.time.get_ticks()
+        # Кадры видео и заставка меняются по времени - экран перерисовывается целиком каждый кадр
+        self.dirty.mark_all()
+
+        current_time = clock.get_ticks()
         elapsed_time_ms = current_time - self.start_time
 
         if self.state == "video":
@@ -84,46 +137,46 @@ class SplashScreen:
     def draw(self):
         """Отрисовывает заставку."""
         if self.state == "video":
-            current_time = pygame.time.get_ticks()
-            elapsed_time_ms = current_time - self.start_time
-            t = elapsed_time_ms / 1000.0
-            if 0 <= t <= self.splash_clip.duration:
-                try:
-                    frame = self.splash_clip.get_frame(t=t)
-                    if frame is not None and frame.size > 0:
-                        frame_surface = pygame.surfarray.make_surface(frame.swapaxes(0, 1))
-                        # Масштабируем под экран, сохраняя пропорции
-                        screen_w, screen_h = self.settings["screen_width"], self.settings["screen_height"]
-                        img_w, img_h = frame_surface.get_size()
-                        scale = min(screen_w / img_w, screen_h / img_h)
-                        new_w, new_h = int(img_w * scale), int(img_h * scale)
-                        scaled_frame = pygame.transform.smoothscale(frame_surface, (new_w, new_h))
-                        rect = scaled_frame.get_rect(center=(screen_w//2, screen_h//2))
-                        self.screen.blit(scaled_frame, rect)
-                    else:
-                        self.screen.fill((0, 0, 0))
-                except Exception as e:
-                    print(f"Ошибка получения кадра видео: {e}")
-                    self.screen.fill((0, 0, 0))
+            screen_w, screen_h = self.screen.get_size()
+            elapsed_time_ms = clock.get_ticks() - self.start_time
+            if self.video_decoder is None or self.video_screen_size != (screen_w, screen_h):
+                # Размер экрана изменился - кадры нужно готовить под новый размер
+                self._start_video_decoder(elapsed_time_ms)
+            # Декодер сам держит синхронизацию: отдает последний готовый кадр, не блокируя отрисовку
+            frame_surface = self.video_decoder.get_frame(elapsed_time_ms)
+            if frame_surface is not None:
+                rect = frame_surface.get_rect(center=(screen_w//2, screen_h//2))
+                self.screen.blit(frame_surface, rect)
+            else:
+                self.screen.fill((0, 0, 0))
         
         elif self.state == "image" and self.splash_surface:
-            # Масштабируем изображение под экран, сохраняя пропорции
-            screen_w, screen_h = self.settings["screen_width"], self.settings["screen_height"]
-            img_w, img_h = self.splash_surface.get_size()
-            scale = min(screen_w / img_w, screen_h / img_h)
-            new_w, new_h = int(img_w * scale), int(img_h * scale)
-            scaled_image = pygame.transform.smoothscale(self.splash_surface, (new_w, new_h))
-            rect = scaled_image.get_rect(center=(screen_w//2, screen_h//2))
-            self.screen.blit(scaled_image, rect)
+            if (self.scaled_splash_surface is None or
+                    self.scaled_splash_surface.get_size() != self.screen.get_size()):
+                self._build_scaled_splash()
+            self.screen.blit(self.scaled_splash_surface, (0, 0))
         
         # Если state == "finished" или изображение/видео не загружено, экран остается черным
 
-    def _finish(self):
-        """Завершает показ заставки и освобождает ресурсы."""
-        self.state = "finished"
+    def exit(self):
+        """Освобождает видео и изображение заставки, когда она покинута."""
+        if self.video_decoder:
+            # Сначала останавливаем декодер, чтобы он не читал из закрытого клипа
+            self.video_decoder.stop()
+            self.video_decoder = None
         if self.splash_clip:
             self.splash_clip.close()
             self.splash_clip = None
+        if self.splash_surface:
+            # Заставка больше не понадобится - освобождаем её в кэше ресурсов
+            self.splash_surface = None
+            self.scaled_splash_surface = None
+            asset_manager.release(SPLASH_IMAGE_FILE)
+
+    def _finish(self):
+        """Завершает показ заставки."""
+        self.state = "finished"
+        # Менеджер сцен вызовет exit() и освободит ресурсы при переходе
         self.on_finish() # Вызываем callback
 
     def is_finished(self):
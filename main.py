@@ -1,128 +1,185 @@
 # main.py
 """Главная точка входа в игру."""
 
+import argparse
 import pygame
 import sys
 import os
 
 # Импорты из наших модулей
 from data.settings import (
-    load_settings, save_settings, set_display_mode, apply_volume_settings,
-    load_main_menu_background, load_button_sound
+    load_settings, set_display_mode, apply_volume_settings,
+    load_main_menu_background, load_button_sound, preload_media,
+    MAIN_MENU_MUSIC_FILE, GAME_MUSIC_FILE, MAIN_MENU_BACKGROUND_FILE, BUTTON_SOUND_FILE, ASSET_ARCHIVE_FILE
 )
-from data.localization import get_text
+from data.localization import get_text, subscribe_language_changed
+from data.paths import PATHS_DATA
+from utils.asset_manager import asset_manager
+from utils.asset_archive import AssetArchive
+from utils.profiler import profiler
+from utils.sound_manager import sound_manager, pre_init_mixer
+from utils.music_service import music_service, MUSIC_CHANNELS
+from utils.log import log, LEVELS_BY_NAME, LOG_FILE
+from utils.replay import InputRecorder, InputReplayer
+from utils import clock as game_clock
+from ui.text_cache import text_cache
+from ui import fonts
+from ui.profiler_overlay import ProfilerOverlay
 from game_states.splash_screen import SplashScreen
 from game_states.main_menu import MainMenu
 from game_states.settings_menu import SettingsMenu
 from game_states.character_creation import CharacterCreation
+from game_states.scene_manager import SceneManager
 
 # --- Константы ---
 FPS = 60
+UNFOCUSED_FPS = 10 # Частота кадров, пока окно не в фокусе (в режиме простоя)
+IDLE_WAIT_MS = 500 # Сколько максимум ждать события, когда перерисовывать нечего
+# События, после которых окно снова работает на полной частоте
+INPUT_EVENTS = (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION, pygame.MOUSEWHEEL,
+                pygame.TEXTINPUT, pygame.WINDOWFOCUSGAINED)
+PLACEHOLDER_BACKGROUND_COLOR = (15, 15, 25) # Пока фон меню грузится
+PROFILER_KEY = pygame.K_F3 # Показать/скрыть график времени кадра
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Запуск игры.")
+    parser.add_argument("--profile-csv", metavar="PATH",
+                        help="Замерять время кадра по фазам и сохранить статистику в CSV при выходе")
+    replay_group = parser.add_mutually_exclusive_group()
+    replay_group.add_argument("--record", metavar="PATH", help="Записать ввод в файл")
+    replay_group.add_argument("--replay", metavar="PATH",
+                              help="Повторить записанный ввод (время берется из записи)")
+    parser.add_argument("--log-level", choices=list(LEVELS_BY_NAME), default="info",
+                        help="Минимальный уровень сообщений журнала")
+    parser.add_argument("--log-file", default=LOG_FILE, help="Файл журнала")
+    parser.add_argument("--headless", action="store_true",
+                        help="Без окна и звука; при --replay кадры идут без ограничения FPS")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Главная функция игры."""
+    args = parse_args(argv)
+    # Журнал пишется фоновым потоком, основной цикл не ждет вывода в консоль и файл
+    log.level = LEVELS_BY_NAME[args.log_level]
+    log.start(args.log_file)
+    if args.headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+    # Параметры микшера (маленький буфер - низкая задержка) действуют, только если заданы до pygame.init()
+    pre_init_mixer()
     pygame.init()
-    pygame.mixer.pre_init(44100, -16, 2, 512) # Улучшает задержку звука
-    pygame.mixer.init()
+    if pygame.mixer.get_init() is None:
+        log.warning("audio", "Не удалось инициализировать звук, игра продолжится без него.")
+    # Пулы каналов для звуковых эффектов и два канала для плавной смены музыки
+    sound_manager.setup(extra_reserved=MUSIC_CHANNELS)
+    music_service.setup(sound_manager.extra_channel_ids)
     
     # --- Загрузка настроек ---
     settings = load_settings()
+    apply_volume_settings(settings)
+    music_service.crossfade_ms = settings["music_crossfade_ms"]
+    asset_manager.set_memory_budget(settings["asset_memory_budget_mb"])
+    # Если собран архив ресурсов, изображения берутся из него без декодирования PNG
+    asset_archive = AssetArchive.open(ASSET_ARCHIVE_FILE)
+    if asset_archive:
+        asset_manager.attach_archive(asset_archive)
     
     # --- Инициализация экрана ---
     screen = set_display_mode(settings)
     pygame.display.set_caption(get_text(settings, "title"))
     clock = pygame.time.Clock()
+    # Профилировщик кадров: включен, пока виден график (F3) или задан --profile-csv
+    profiler_overlay = ProfilerOverlay(profiler)
+    profiler.enabled = args.profile_csv is not None
 
     # --- Загрузка медиафайлов ---
-    button_sound = load_button_sound()
-    if button_sound:
-        print("Звук кнопки успешно загружен.")
-        from ui.button import Button
-        Button.click_sound = button_sound
-        # Устанавливаем начальную громкость звуков
-        Button.sfx_volume = settings["sfx_volume"]
-    else:
-        print("Звук кнопки НЕ БЫЛ загружен. Проверьте путь к файлу и его формат.")
-    
-    main_menu_music_file = "assets/main_menu.mp3" # Путь дублируется, можно вынести в settings
-    main_menu_music_loaded = False
-    if os.path.exists(main_menu_music_file):
-        try:
-            pygame.mixer.music.load(main_menu_music_file)
-            apply_volume_settings(settings) # Применяем громкость музыки сразу после загрузки
-            main_menu_music_loaded = True
-        except pygame.error as e:
-            print(f"Ошибка загрузки музыки '{main_menu_music_file}': {e}")
-    else:
-        print(f"Файл музыки '{main_menu_music_file}' не найден.")
+    # Тяжелые файлы декодируются в рабочих потоках, пока показывается заставка.
+    # В главном потоке остается только convert() (asset_manager.poll() в цикле)
+    screen_width, screen_height = screen.get_size()
+    preload_media(screen_width, screen_height, [path_data["id"] for path_data in PATHS_DATA])
+    button_sound = None # Назначается, когда звук загрузится
+    button_sound_pending = True
+
+    # Музыка меню декодируется в фоне, пока идет заставка
+    music_service.preload(MAIN_MENU_MUSIC_FILE)
 
-    # --- Состояния игры ---
+    def play_main_menu_music():
+        """Запускает музыку меню (если она еще грузится - как только загрузится)."""
+        music_service.play(MAIN_MENU_MUSIC_FILE)
+
+    def collect_background_loads():
+        """Подхватывает медиафайлы, загрузка которых завершилась в фоне."""
+        nonlocal button_sound, button_sound_pending
+        if button_sound_pending and not asset_manager.is_loading(BUTTON_SOUND_FILE):
+            button_sound_pending = False
+            button_sound = load_button_sound() # Уже в кэше, не блокирует
+            if button_sound:
+                log.info("audio", "Звук кнопки успешно загружен.")
+                from ui.button import Button
+                Button.click_sound = button_sound
+            else:
+                log.warning("audio", "Звук кнопки НЕ БЫЛ загружен. Проверьте путь к файлу и его формат.")
+
+    # --- Сцены игры (id для менеджера сцен) ---
     class GameState:
         SPLASH = "splash"
         MAIN_MENU = "main_menu"
         SETTINGS = "settings"
         CHARACTER_CREATION = "character_creation"
 
-    current_state = GameState.SPLASH
+    scene_manager = SceneManager()
 
-    # --- Callback для обновления screen у всех состояний ---
+    # --- Обновление screen у всех сцен (основной цикл вызывает при смене режима отображения) ---
     def update_all_screens(new_screen):
-        """Обновляет screen у всех игровых состояний."""
+        """Обновляет screen у всех созданных сцен (новые сцены получат его при создании)."""
         nonlocal screen
         screen = new_screen
-        try:
-            splash_screen.screen = screen
-        except NameError:
-            pass # splash_screen еще не создан
-        main_menu.screen = screen
-        # settings_menu.screen будет обновлен в draw/update цикле при необходимости
-        character_creation.screen = screen
+        scene_manager.set_screen(screen)
         pygame.display.set_caption(get_text(settings, "title"))
 
-    # --- Инициализация состояний (с callback'ами) ---
+    # --- Callback'и сцен ---
     def finish_splash():
         """Вызывается по завершении заставки."""
-        nonlocal current_state
-        current_state = GameState.MAIN_MENU
+        scene_manager.switch(GameState.MAIN_MENU)
         # Начинаем воспроизводить музыку главного меню после заставки
-        if main_menu_music_loaded:
-            try:
-                # Громкость уже установлена в apply_volume_settings при загрузке
-                pygame.mixer.music.play(-1) # -1 для зацикливания
-            except pygame.error as e:
-                print(f"Ошибка воспроизведения музыки: {e}")
+        play_main_menu_music()
 
     def start_new_game():
         """Вызывается при нажатии 'Новая Игра'."""
-        nonlocal current_state
-        current_state = GameState.CHARACTER_CREATION
-        # Музыка меню продолжает играть во время создания персонажа
+        # Музыка меню продолжает играть во время создания персонажа,
+        # а музыка игры заранее декодируется, чтобы переход в игру не ждал загрузки
+        if os.path.exists(GAME_MUSIC_FILE):
+            music_service.preload(GAME_MUSIC_FILE)
+        scene_manager.push(GameState.CHARACTER_CREATION)
 
     def go_to_settings():
         """Вызывается при нажатии 'Настройки'."""
-        nonlocal current_state, settings_menu
-        current_state = GameState.SETTINGS
-        # settings_menu будет создан/пересоздан в цикле
+        scene_manager.push(GameState.SETTINGS)
+
+    def save_on_exit():
+        # Дописываем отложенные изменения настроек синхронно
+        settings.flush()
+        if recorder is not None:
+            recorder.close()
+        if args.profile_csv:
+            profiler.write_csv(args.profile_csv)
 
     def exit_game():
         """Вызывается при нажатии 'Выход'."""
-        save_settings(settings)
-        pygame.mixer.music.stop()
+        save_on_exit()
+        music_service.stop(fade_ms=0)
         pygame.quit()
         sys.exit()
 
     def back_to_main_menu():
         """Вызывается при нажатии 'Назад' в различных меню."""
-        nonlocal current_state
-        current_state = GameState.MAIN_MENU
-        # Перезапускаем музыку меню при возврате, если она не играет
-        if main_menu_music_loaded and not pygame.mixer.music.get_busy():
-            try:
-                # Убеждаемся, что громкость актуальна
-                apply_volume_settings(settings)
-                pygame.mixer.music.play(-1)
-            except pygame.error as e:
-                print(f"Ошибка воспроизведения музыки: {e}")
+        # Закрываем открытые поверх меню сцены
+        while scene_manager.depth > 1:
+            scene_manager.pop()
+        if scene_manager.current_id != GameState.MAIN_MENU:
+            scene_manager.switch(GameState.MAIN_MENU)
+        # Возвращаем музыку меню, если играла другая (плавно, без остановки основного цикла)
+        play_main_menu_music()
 
     def character_created(character_data):
         """Callback при завершении создания персонажа."""
@@ -134,137 +191,238 @@ def main():
             path_name = get_localized_path_name(settings, path_data)
         else:
             path_name = character_data['path_id'] # fallback
-        print(get_text(settings, "character_created").format(name=character_data['name'], path=path_name))
+        log.info("game", get_text(settings, "character_created").format(name=character_data['name'], path=path_name))
         
-        print("Персонаж создан. Переход к основной игре...")
-        # TODO: Здесь нужно остановить музыку меню и запустить игровую музыку/логику
-        pygame.mixer.music.stop() # Останавливаем музыку меню при переходе к реальной игре
-        print("Музыка меню остановлена. Запуск игры...")
+        log.info("game", "Персонаж создан. Переход к основной игре...")
+        # Музыка меню плавно сменяется музыкой игры (она уже декодирована в фоне)
+        if os.path.exists(GAME_MUSIC_FILE):
+            music_service.play(GAME_MUSIC_FILE)
+        else:
+            music_service.stop()
+        log.info("audio", "Музыка меню сменяется музыкой игры. Запуск игры...")
         # Пока просто возвращаем в меню
         back_to_main_menu()
 
-    # Создание экземпляров состояний
-    splash_screen = SplashScreen(screen, settings, finish_splash)
-    # Инициализируем меню без фона, он будет рисоваться в основном цикле
-    main_menu = MainMenu(screen, settings, start_new_game, lambda: print(get_text(settings, "loading_not_implemented")), go_to_settings, exit_game)
-    # settings_menu инициализируем как None, будет создан при переходе
-    settings_menu = None
-    character_creation = CharacterCreation(screen, settings, character_created, back_to_main_menu)
+    def language_changed(catalog):
+        """Вызывается при смене языка (раньше сцен, которые перерисуют надписи)."""
+        # Строки на старом языке больше не понадобятся
+        text_cache.clear()
+        pygame.display.set_caption(catalog["title"])
+
+    subscribe_language_changed(language_changed)
+
+    def settings_changed(change_type):
+        """Применяет настройку, измененную в меню настроек (сохранение - в settings.poll())."""
+        if change_type == "language":
+            # Сцены уже обновили надписи по уведомлению о смене языка
+            log.debug("settings", "Применение изменений языка...")
+        elif change_type == "music_volume":
+            log.debug("settings", "Применение изменений громкости музыки...")
+            # НЕМЕДЛЕННО применяем громкость музыки
+            apply_volume_settings(settings) # Громкость каналов music_service
+        elif change_type == "sfx_volume":
+            log.debug("settings", "Применение изменений громкости звуков...")
+            # Громкость группы звуков меняется на каналах, в том числе у уже играющих
+            apply_volume_settings(settings)
+
+    # Регистрация сцен: каждая создается при первом входе в неё.
+    # Заставка после выхода удаляется вместе с видео
+    scene_manager.register(GameState.SPLASH, lambda: SplashScreen(screen, settings, finish_splash),
+                           keep_alive=False)
+    scene_manager.register(GameState.MAIN_MENU, lambda: MainMenu(
+        screen, settings, start_new_game, lambda: log.info("game", get_text(settings, "loading_not_implemented")),
+        go_to_settings, exit_game))
+    scene_manager.register(GameState.SETTINGS, lambda: SettingsMenu(
+        screen, settings, back_to_main_menu, on_change=settings_changed))
+    scene_manager.register(GameState.CHARACTER_CREATION, lambda: CharacterCreation(
+        screen, settings, character_created, back_to_main_menu))
+
+    # --- Запись и повтор ввода ---
+    # Время фиксируется один раз на кадр (utils/clock.py), при повторе - берется из записи,
+    # поэтому заставка и наведение повторяются покадрово точно
+    recorder = None
+    replayer = None
+    replay_info = {"screen": list(screen.get_size()), "language": settings["language"]}
+    if args.replay:
+        replayer = InputReplayer.open(args.replay)
+        if replayer is None:
+            sys.exit(1)
+        if replayer.info != replay_info:
+            log.warning("replay", "Запись сделана с другими настройками (%s), повтор может расходиться.", replayer.info)
+        game_clock.begin_frame(replayer.start_ticks)
+    elif args.record:
+        recorder = InputRecorder(args.record, game_clock.begin_frame(), replay_info)
+    else:
+        game_clock.begin_frame()
+    # Повтор без окна идет с максимальной скоростью (как нагрузка для замеров)
+    frame_limit = 0 if replayer is not None and args.headless else FPS
+
+    scene_manager.switch(GameState.SPLASH)
+
+    def draw_background(scene):
+        """Рисует фон меню (с учетом текущей области отсечения экрана)."""
+        # Используем режим "cover" - изображение масштабируется, чтобы покрыть весь экран
+        if scene is not None and not scene.uses_menu_background:
+            return # Например, заставка рисует весь экран сама
+        if main_menu_background:
+            # Центрируем фон (он уже правильно масштабирован)
+            bg_rect = main_menu_background.get_rect(center=(screen_width//2, screen_height//2))
+            screen.blit(main_menu_background, bg_rect)
+        else:
+            # Фон еще грузится (или не найден) - рисуем простую заливку
+            screen.fill(PLACEHOLDER_BACKGROUND_COLOR)
 
     # --- Основной игровой цикл ---
     running = True
     # Для отрисовки фона меню
     main_menu_background = None
     main_menu_background_dims = (0, 0) # Для отслеживания изменений размера
+    scenes_screen_dims = screen.get_size() # Размер экрана, под который разложены сцены
+    # Режим частичной перерисовки: обновляем только области, о которых сообщила сцена
+    dirty_rects_mode = settings.get("dirty_rects", False)
+    last_drawn_scene = None
+    last_drawn_dims = (0, 0)
+    fonts_warmed_up = False
+    # Режим простоя: если ничего не меняется, не рисуем, а ждем событие
+    # (при повторе ввод приходит из записи, ждать событий от системы нельзя)
+    idle_mode = settings.get("idle_mode", True) and replayer is None
+    window_focused = True
+    waited_event = None # Событие, которым закончилось ожидание в режиме простоя
 
     while running:
-        # Загружаем/обновляем фон, если это необходимо
+        if replayer is not None:
+            recorded_frame = replayer.next_frame()
+            if recorded_frame is None:
+                log.info("replay", "Запись ввода закончилась.")
+                break
+            frame_ticks, recorded_mouse_pos, recorded_events = recorded_frame
+            game_clock.begin_frame(frame_ticks)
+        else:
+            frame_ticks = game_clock.begin_frame()
+        profiler.begin_frame(scene_manager.current_id)
+        # Доводим до готовности то, что загрузилось в фоне (convert в главном потоке)
+        asset_manager.poll()
+        if button_sound_pending:
+            collect_background_loads()
+        # Трек, который ждал загрузки, начинается сразу после poll()
+        music_service.update()
+
+        # Режим отображения сменили (set_mode) - передаем экран сценам, чтобы они пересоздали раскладку
+        display_surface = pygame.display.get_surface()
+        if display_surface is not screen or display_surface.get_size() != scenes_screen_dims:
+            update_all_screens(display_surface)
+            scenes_screen_dims = screen.get_size()
+
+        # Загружаем/обновляем фон, если это необходимо (не ждем, пока он грузится в фоне)
         screen_width, screen_height = screen.get_size()
-        if (main_menu_background is None or 
-            main_menu_background_dims != (screen_width, screen_height)):
+        background_changed = False
+        if (main_menu_background_dims != (screen_width, screen_height) and
+                not asset_manager.is_loading(MAIN_MENU_BACKGROUND_FILE)):
             main_menu_background = load_main_menu_background(screen_width, screen_height)
             main_menu_background_dims = (screen_width, screen_height)
-            
+            background_changed = True
+        profiler.mark("update")
+
         mouse_pos = pygame.mouse.get_pos()
         events = pygame.event.get()
+        if waited_event is not None:
+            events.insert(0, waited_event)
+            waited_event = None
+        if replayer is not None:
+            # Живой ввод заменяется записанным, но окно по-прежнему можно закрыть
+            mouse_pos = recorded_mouse_pos
+            events = recorded_events + [event for event in events if event.type == pygame.QUIT]
+        elif recorder is not None:
+            recorder.record_frame(frame_ticks, mouse_pos, events)
 
         for event in events:
             if event.type == pygame.QUIT:
-                save_settings(settings)
                 running = False
+            elif event.type == pygame.WINDOWFOCUSLOST:
+                window_focused = False
+            elif event.type in INPUT_EVENTS:
+                window_focused = True
+            if event.type == pygame.KEYDOWN and event.key == PROFILER_KEY:
+                profiler_overlay.toggle()
+                profiler.enabled = profiler_overlay.visible or args.profile_csv is not None
+                if scene_manager.current is not None:
+                    scene_manager.current.dirty.mark(profiler_overlay.rect)
+                continue
 
-            # --- ТЕСТ: Воспроизведение звука по нажатию 'B' ---
-            # if event.type == pygame.KEYDOWN:
-            #     if event.key == pygame.K_b and button_sound:
-            #         print("Тестовое воспроизведение звука по нажатию 'B'")
-            #         button_sound.set_volume(settings["sfx_volume"])
-            #         button_sound.play()
-            # --- КОНЕЦ ТЕСТА ---
-
-            # --- Обработка событий в зависимости от состояния ---
-            # ВАЖНО: Убираем проверки 'and settings_menu' и т.д.
-            # Если состояние SETTINGS, мы должны обрабатывать события, даже если объект еще не создан
-            if current_state == GameState.SPLASH:
-                splash_screen.handle_event(event, mouse_pos)
-            elif current_state == GameState.MAIN_MENU:
-                main_menu.handle_event(event, mouse_pos)
-            elif current_state == GameState.SETTINGS:
-                 # settings_menu будет создан ниже, если он нужен
-                 if settings_menu: # Только если он уже существует
-                     settings_menu.handle_event(event, mouse_pos)
-            elif current_state == GameState.CHARACTER_CREATION:
-                character_creation.handle_event(event, mouse_pos)
+            # --- Обработка событий активной сценой ---
+            scene_manager.handle_event(event, mouse_pos)
+        profiler.mark("events")
 
         # --- Обновление ---
-        if current_state == GameState.SPLASH:
-            splash_screen.update(mouse_pos)
-        elif current_state == GameState.MAIN_MENU:
-             main_menu.update(mouse_pos)
-        elif current_state == GameState.SETTINGS:
-             # Пересоздаем settings_menu при каждом цикле в состоянии SETTINGS
-             # Это гарантирует, что он всегда существует и имеет правильные параметры
-             if settings_menu is None:
-                 settings_menu = SettingsMenu(screen, settings, back_to_main_menu)
-             settings_menu.update(mouse_pos)
-             
-             if settings_menu:
-                 change_type = getattr(settings_menu, 'pending_change', None)
-                 if change_type == "language":
-                     print("Применение изменений языка...")
-                     save_settings(settings)
-                     main_menu = MainMenu(screen, settings, start_new_game, lambda: print(get_text(settings, "loading_not_implemented")), go_to_settings, exit_game)
-                     character_creation = CharacterCreation(screen, settings, character_created, back_to_main_menu)
-                     # Пересоздаем settings_menu с новым языком
-                     settings_menu = SettingsMenu(screen, settings, back_to_main_menu)
-                     settings_menu.pending_change = None
-                 elif change_type == "music_volume":
-                     print("Применение изменений громкости музыки...")
-                     save_settings(settings)
-                     # НЕМЕДЛЕННО применяем громкость музыки
-                     apply_volume_settings(settings) # Применяет pygame.mixer.music.set_volume
-                     # Пересоздаем settings_menu, чтобы обновить отображение громкости
-                     settings_menu = SettingsMenu(screen, settings, back_to_main_menu)
-                     settings_menu.pending_change = None
-                 elif change_type == "sfx_volume":
-                     print("Применение изменений громкости звуков...")
-                     save_settings(settings)
-                     # НЕМЕДЛЕННО обновляем громкость звуков для кнопок
-                     if button_sound:
-                         from ui.button import Button
-                         Button.sfx_volume = settings["sfx_volume"]
-                     # Пересоздаем settings_menu, чтобы обновить отображение громкости
-                     settings_menu = SettingsMenu(screen, settings, back_to_main_menu)
-                     settings_menu.pending_change = None
-        elif current_state == GameState.CHARACTER_CREATION:
-             character_creation.update(mouse_pos)
+        scene_manager.update(mouse_pos)
+        profiler.mark("update")
 
         # --- Рендеринг ---
-        # Всегда рисуем фон, если он загружен и мы не на заставке
-        # Используем режим "cover" - изображение масштабируется, чтобы покрыть весь экран
-        if main_menu_background and current_state != GameState.SPLASH:
-            # Центрируем фон (он уже правильно масштабирован)
-            bg_rect = main_menu_background.get_rect(center=(screen_width//2, screen_height//2))
-            screen.blit(main_menu_background, bg_rect)
-        
-        # ВАЖНО: Убираем проверки 'and settings_menu'
-        if current_state == GameState.SPLASH:
-            splash_screen.draw()
-        elif current_state == GameState.MAIN_MENU:
-            main_menu.draw()
-        elif current_state == GameState.SETTINGS:
-            # Убедимся, что settings_menu существует перед рисованием
-            # (на случай, если он не был создан в update)
-            if settings_menu is None:
-                settings_menu = SettingsMenu(screen, settings, back_to_main_menu)
-            settings_menu.draw()
-        elif current_state == GameState.CHARACTER_CREATION:
-            character_creation.draw()
-
-        pygame.display.flip()
-        clock.tick(FPS)
-
-    save_settings(settings)
-    pygame.mixer.music.stop()
+        scene = scene_manager.current
+        screen_dims = screen.get_size()
+        animating = scene is not None and (scene.is_animating() or profiler_overlay.visible)
+        if scene is not None and profiler_overlay.visible:
+            scene.dirty.mark(profiler_overlay.rect)
+        # В режиме простоя кадр рисуется, только если что-то изменилось
+        needs_redraw = (not idle_mode or scene is None or animating or scene.dirty.has_changes() or
+                        background_changed or scene is not last_drawn_scene or screen_dims != last_drawn_dims)
+        # consume() вызываем всегда, чтобы области не копились и в обычном режиме
+        dirty_rects = scene.dirty.consume() if scene else None
+
+        # Полная перерисовка: режим выключен, сменилось состояние/сцена или разрешение,
+        # либо сцена сама запросила полную перерисовку (dirty_rects is None)
+        if not needs_redraw:
+            pass # Ничего не изменилось - экран остается прежним
+        elif (not dirty_rects_mode or dirty_rects is None or background_changed or
+                scene is not last_drawn_scene or screen_dims != last_drawn_dims):
+            # Всегда рисуем фон, если он загружен и мы не на заставке
+            draw_background(scene)
+            if scene:
+                scene.draw()
+            profiler_overlay.draw(screen, scene_manager.current_id)
+            profiler.mark("draw")
+            pygame.display.flip()
+            profiler.mark("flip")
+            last_drawn_scene = scene
+            last_drawn_dims = screen_dims
+        elif dirty_rects:
+            # Фон и сцена рисуются один раз, с отсечением по общей рамке изменившихся областей
+            # (отдельный проход на каждую область повторял бы всю отрисовку сцены)
+            screen.set_clip(dirty_rects[0].unionall(dirty_rects[1:]))
+            draw_background(scene)
+            scene.draw()
+            screen.set_clip(None)
+            profiler_overlay.draw(screen, scene_manager.current_id)
+            profiler.mark("draw")
+            pygame.display.update(dirty_rects)
+            profiler.mark("flip")
+
+        if not fonts_warmed_up:
+            # Первый кадр заставки уже на экране - создаем шрифты, пока она играет
+            fonts.warm_up()
+            fonts_warmed_up = True
+
+        # Измененные настройки записываются в фоне одной записью после паузы
+        settings.poll()
+        profiler.mark("update")
+
+        # Фоновые загрузки тоже считаются анимацией: их нужно подхватить в poll()
+        busy = (animating or asset_manager.pending_count() > 0 or
+                button_sound_pending or music_service.needs_update())
+        if idle_mode and not busy and running:
+            # Перерисовывать нечего - спим до события (или до записи настроек)
+            timeout = int(settings.debounce * 1000) + 1 if settings.is_dirty else IDLE_WAIT_MS
+            waited_event = pygame.event.wait(timeout)
+            if waited_event.type == pygame.NOEVENT:
+                waited_event = None
+            clock.tick() # Не засчитываем ожидание в длительность следующего кадра
+        else:
+            clock.tick(frame_limit if window_focused or not idle_mode else UNFOCUSED_FPS)
+        profiler.mark("tick")
+        profiler.end_frame()
+
+    save_on_exit()
+    music_service.stop(fade_ms=0)
     pygame.quit()
     sys.exit()
 
@@ -0,0 +1,291 @@
+# tools/benchmark.py
+"""
+Безоконный бенчмарк сцен: каждая сцена получает заранее заданный ввод на
+фиксированном числе кадров в каждом разрешении из COMMON_RESOLUTIONS.
+Результат (FPS, время фаз, созданные поверхности, в том числе состояния кнопок,
+попадания и промахи кэша текста после прогрева, пиковая память) - JSON.
+
+Запуск из корня проекта (дисплей и видеокарта не нужны):
+    python -m tools.benchmark [--frames 300] [--warmup 10] [--resolution 1280x720 ...] [--output bench.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import time
+
+# Бенчмарку не нужны окно и звук
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1") # Приветствие pygame испортило бы JSON
+
+import pygame
+import pygame.sysfont
+
+from data.settings import (
+    DEFAULT_SETTINGS, COMMON_RESOLUTIONS, SettingsStore, load_main_menu_background
+)
+from data.localization import set_language
+from tools.pack_assets import parse_resolution
+from utils.asset_manager import asset_manager
+from ui.text_cache import text_cache
+from ui.button import Button
+from utils.log import log
+from utils.profiler import FrameProfiler, FRAME, WORK_PHASES
+
+DEFAULT_FRAMES = 300
+DEFAULT_WARMUP = 10 # Кадры, которые не попадают в статистику (первая растеризация, загрузки)
+HOVER_FRAMES = 8    # Сколько кадров курсор задерживается на каждом виджете
+BENCH_NAME = "Бенчмарк"
+
+class SurfaceCounter:
+    """
+    Считает созданные поверхности: pygame.Surface(), font.render, convert/copy/subsurface
+    таких поверхностей, функции pygame.transform и загрузку изображений.
+    Поверхности, которые pygame создает внутри себя иначе, не учитываются - счет приблизительный.
+    """
+
+    TRANSFORM_FUNCTIONS = ("scale", "smoothscale", "scale_by", "smoothscale_by",
+                           "rotate", "rotozoom", "flip")
+    IMAGE_FUNCTIONS = ("load", "frombuffer", "frombytes", "fromstring")
+
+    def __init__(self):
+        self.count = 0
+
+    def _wrap(self, function):
+        def counted(*args, **kwargs):
+            self.count += 1
+            return function(*args, **kwargs)
+        return counted
+
+    def install(self):
+        """Подменяет конструкторы поверхностей. Вызывать до создания шрифтов и сцен."""
+        counter = self
+
+        class CountingSurface(pygame.Surface):
+            def __init__(self, *args, **kwargs):
+                counter.count += 1
+                super().__init__(*args, **kwargs)
+
+        for name in ("convert", "convert_alpha", "copy", "subsurface"):
+            setattr(CountingSurface, name, self._wrap(getattr(pygame.Surface, name)))
+
+        class CountingFont(pygame.font.Font):
+            def render(self, *args, **kwargs):
+                counter.count += 1
+                return super().render(*args, **kwargs)
+
+        pygame.Surface = CountingSurface
+        pygame.font.Font = CountingFont
+        pygame.sysfont.Font = CountingFont # SysFont создает шрифты через это имя
+        for module, names in ((pygame.transform, self.TRANSFORM_FUNCTIONS),
+                              (pygame.image, self.IMAGE_FUNCTIONS)):
+            for name in names:
+                if hasattr(module, name):
+                    setattr(module, name, self._wrap(getattr(module, name)))
+
+# --- Сценарии ввода ---
+# Сценарий получает сцену и номер кадра и возвращает (позиция мыши, события кадра)
+
+def click_events(pos):
+    return [pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=pos),
+            pygame.event.Event(pygame.MOUSEBUTTONUP, button=1, pos=pos)]
+
+def hover_sweep(widgets, frame):
+    """Курсор по очереди задерживается на каждом виджете."""
+    if not widgets:
+        return (0, 0), []
+    pos = pygame.Rect(widgets[(frame // HOVER_FRAMES) % len(widgets)].rect).center
+    return pos, [pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0))]
+
+def splash_input(scene, frame):
+    return (0, 0), [] # Заставка идет сама, без ввода
+
+def main_menu_input(scene, frame):
+    return hover_sweep(scene.buttons, frame)
+
+def settings_input(scene, frame):
+    _, slider = scene.sliders[0]
+    cycle = frame % 120
+    if cycle < 60:
+        # Перетаскиваем ползунок громкости туда и обратно
+        rect = slider.rect
+        offset = cycle if cycle < 30 else 60 - cycle
+        pos = (rect.left + rect.width * offset // 30, rect.centery)
+        if cycle == 0:
+            return pos, [pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=pos)]
+        if cycle == 59:
+            return pos, [pygame.event.Event(pygame.MOUSEBUTTONUP, button=1, pos=pos)]
+        return pos, [pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(1, 0), buttons=(1, 0, 0))]
+    if cycle == 119:
+        # Переключение языка перерисовывает все надписи
+        pos = dict(scene.buttons)["language"].rect.center
+        return pos, click_events(pos)
+    return hover_sweep([button for key, button in scene.buttons if key != "back"], frame)
+
+def name_input(scene, frame):
+    text_input = scene.name_input
+    if frame == 0:
+        pos = text_input.rect.center
+        return pos, click_events(pos)
+    pos = scene.name_confirm_button.rect.center if (frame // HOVER_FRAMES) % 2 else text_input.rect.center
+    motion = pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0))
+    if len(text_input.text) >= text_input.max_length - 1:
+        return pos, [motion, pygame.event.Event(pygame.KEYDOWN, key=pygame.K_BACKSPACE, unicode="\b", mod=0)]
+    letter = BENCH_NAME[frame % len(BENCH_NAME)]
+    return pos, [motion, pygame.event.Event(pygame.TEXTINPUT, text=letter)]
+
+def path_input(scene, frame):
+    buttons = [button for _, button in scene.path_buttons]
+    pos, events = hover_sweep(buttons, frame)
+    if frame % HOVER_FRAMES == HOVER_FRAMES - 1:
+        events += click_events(pos) # Открываем описание пути и портрет
+    return pos, events
+
+def submit_name(scene):
+    """Переводит создание персонажа на выбор пути."""
+    for event in click_events(scene.name_input.rect.center):
+        scene.handle_event(event, event.pos)
+    scene.handle_event(pygame.event.Event(pygame.TEXTINPUT, text=BENCH_NAME), (0, 0))
+    scene.handle_event(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RETURN, unicode="\r", mod=0), (0, 0))
+
+def build_scenarios(screen, settings):
+    """Возвращает список (имя, фабрика сцены, подготовка, сценарий ввода)."""
+    from game_states.splash_screen import SplashScreen
+    from game_states.main_menu import MainMenu
+    from game_states.settings_menu import SettingsMenu
+    from game_states.character_creation import CharacterCreation
+
+    def nothing(*args):
+        pass
+
+    return [
+        ("splash", lambda: SplashScreen(screen, settings, nothing), None, splash_input),
+        ("main_menu", lambda: MainMenu(screen, settings, nothing, nothing, nothing, nothing),
+         None, main_menu_input),
+        ("settings", lambda: SettingsMenu(screen, settings, nothing), None, settings_input),
+        ("character_creation.enter_name", lambda: CharacterCreation(screen, settings, nothing, nothing),
+         None, name_input),
+        ("character_creation.choose_path", lambda: CharacterCreation(screen, settings, nothing, nothing),
+         submit_name, path_input),
+    ]
+
+def run_scene(name, scene, script, screen, background, profiler, counter, frames, warmup):
+    """Прогоняет сцену и возвращает результаты в виде словаря."""
+    mouse_pos = (0, 0)
+
+    def run_frame(frame):
+        nonlocal mouse_pos
+        profiler.begin_frame(name)
+        asset_manager.poll()
+        profiler.mark("update")
+        mouse_pos, events = script(scene, frame)
+        for event in events:
+            scene.handle_event(event, mouse_pos)
+        profiler.mark("events")
+        scene.update(mouse_pos)
+        profiler.mark("update")
+        # Каждый кадр рисуется целиком - худший случай для основного цикла
+        scene.dirty.consume()
+        if scene.uses_menu_background:
+            if background is not None:
+                screen.blit(background, (0, 0))
+            else:
+                screen.fill((0, 0, 0))
+        scene.draw()
+        profiler.mark("draw")
+        pygame.display.flip()
+        profiler.mark("flip")
+        profiler.end_frame()
+
+    profiler.enabled = False
+    for frame in range(warmup):
+        run_frame(frame)
+    setup_surfaces = counter.count
+    # Промахи кэша текста после прогрева - растеризация в установившемся режиме
+    text_cache.reset_stats()
+    button_surfaces = Button.surface_allocations
+
+    profiler.enabled = True
+    start = time.perf_counter()
+    for frame in range(warmup, warmup + frames):
+        run_frame(frame)
+    elapsed = time.perf_counter() - start
+    profiler.enabled = False
+
+    phases = {}
+    for phase, (count, mean, p50, p95, p99, worst) in profiler.stats(name).items():
+        if phase in WORK_PHASES or phase == FRAME:
+            phases[phase] = {"mean_ms": mean * 1000, "p50_ms": p50 * 1000, "p95_ms": p95 * 1000,
+                             "p99_ms": p99 * 1000, "max_ms": worst * 1000}
+    return {
+        "fps": frames / elapsed if elapsed > 0 else 0.0,
+        "phases": phases,
+        "surfaces_setup": setup_surfaces,
+        "surfaces_per_frame": (counter.count - setup_surfaces) / frames,
+        "text_cache_hits": text_cache.hits,
+        "text_cache_misses": text_cache.misses,
+        # Состояния кнопок, отрисованные заново после прогрева (входят и в surfaces_per_frame)
+        "button_surfaces": Button.surface_allocations - button_surfaces,
+        # ru_maxrss - пик за весь процесс (в Linux в килобайтах), поэтому не убывает
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+def run(resolutions, frames, warmup):
+    counter = SurfaceCounter()
+    counter.install()
+    pygame.init()
+    results = []
+    for width, height in resolutions:
+        screen = pygame.display.set_mode((width, height))
+        settings = SettingsStore(dict(DEFAULT_SETTINGS, screen_width=width, screen_height=height))
+        # Файл настроек бенчмарк не пишет: settings.poll()/flush() не вызываются
+        background = load_main_menu_background(width, height)
+        for name, factory, prepare, script in build_scenarios(screen, settings):
+            counter.count = 0
+            scene = factory()
+            scene.enter()
+            if prepare is not None:
+                prepare(scene)
+            profiler = FrameProfiler(capacity=frames)
+            result = run_scene(name, scene, script, screen, background, profiler, counter, frames, warmup)
+            scene.exit()
+            results.append(dict(scene=name, resolution=f"{width}x{height}", **result))
+            log.info("benchmark", "%s %dx%d: %.1f FPS", name, width, height, result["fps"])
+        set_language(settings, DEFAULT_SETTINGS["language"])
+    pygame.quit()
+    return {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "sdl": ".".join(map(str, pygame.get_sdl_version())),
+        "video_driver": os.environ["SDL_VIDEODRIVER"],
+        "frames": frames,
+        "warmup": warmup,
+        "results": results,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Безоконный бенчмарк сцен игры.")
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES, help="Замеряемых кадров на сцену")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP, help="Кадров прогрева на сцену")
+    parser.add_argument("--resolution", type=parse_resolution, action="append", default=[],
+                        help="Разрешение ШИРИНАxВЫСОТА (по умолчанию - все COMMON_RESOLUTIONS)")
+    parser.add_argument("--output", help="Файл для JSON (по умолчанию - стандартный вывод)")
+    args = parser.parse_args(argv)
+
+    # Журнал пишет в stderr, поэтому стандартный вывод остается чистым JSON
+    log.start(None)
+    report = run(args.resolution or COMMON_RESOLUTIONS, max(1, args.frames), max(0, args.warmup))
+    log.stop()
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+# tools/pack_assets.py
+"""
+Офлайн-упаковщик ресурсов: декодирует изображения в готовые для дисплея пиксели
+и записывает их в один индексированный архив, который игра отображает в память.
+
+Запуск из корня проекта:
+    python -m tools.pack_assets [--prescale] [--resolution 1920x1080 ...] [--output assets/assets.pak]
+"""
+
+import argparse
+import os
+import sys
+
+# Упаковщику не нужно окно: формат пикселей берется у скрытого дисплея
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from data.settings import (
+    MAIN_MENU_BACKGROUND_FILE, SPLASH_IMAGE_FILE, ASSET_ARCHIVE_FILE, COMMON_RESOLUTIONS,
+    find_path_image_file
+)
+from data.paths import PATHS_DATA
+from utils.asset_manager import FORMAT_OPAQUE, FORMAT_ALPHA, FIT_COVER, FIT_CONTAIN, fit_size
+from utils.asset_archive import archive_key, write_archive
+
+def parse_resolution(text):
+    """Разбирает строку вида 1920x1080."""
+    try:
+        width, height = text.lower().split("x")
+        return int(width), int(height)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Неверное разрешение '{text}', ожидается ШИРИНАxВЫСОТА")
+
+def collect_images(resolutions):
+    """
+    Возвращает список (исходный файл, формат пикселей, режим вписывания) и
+    разрешения, под которые изображение нужно заранее отмасштабировать.
+    """
+    images = [
+        # Фон меню покрывает экран, заставка вписывается в него целиком
+        (MAIN_MENU_BACKGROUND_FILE, FORMAT_OPAQUE, FIT_COVER, resolutions),
+        (SPLASH_IMAGE_FILE, FORMAT_OPAQUE, FIT_CONTAIN, resolutions),
+    ]
+    for path_data in PATHS_DATA:
+        image_path = find_path_image_file(path_data["id"])
+        if image_path:
+            images.append((image_path, FORMAT_ALPHA, None, []))
+    return images
+
+def pack(output, resolutions):
+    """Упаковывает изображения в архив output."""
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+
+    entries = []
+    sources = []
+    for path, pixel_format, fit, sizes in collect_images(resolutions):
+        if not os.path.exists(path):
+            print(f"Файл '{path}' не найден, пропускаем.")
+            continue
+        # Переводим в формат дисплея так же, как это делает AssetManager
+        source = pygame.image.load(path)
+        source = source.convert_alpha() if pixel_format == FORMAT_ALPHA else source.convert()
+        has_alpha = pixel_format == FORMAT_ALPHA
+        sources.append(path)
+        entries.append((archive_key(path, None, pixel_format), source, has_alpha, path))
+        print(f"{path}: {source.get_width()}x{source.get_height()}")
+
+        for size in sizes:
+            scaled = pygame.transform.smoothscale(source, fit_size(source.get_size(), size, fit))
+            entries.append((archive_key(path, size, pixel_format, fit), scaled, has_alpha, path))
+            print(f"{path}: {size[0]}x{size[1]} ({fit}) -> {scaled.get_width()}x{scaled.get_height()}")
+
+    write_archive(output, entries, sources)
+    print(f"Архив '{output}' записан: {len(entries)} изображений, {os.path.getsize(output) / (1024 * 1024):.1f} МБ.")
+    pygame.quit()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Упаковка изображений игры в архив для быстрого запуска.")
+    parser.add_argument("--output", default=ASSET_ARCHIVE_FILE, help="Путь к архиву")
+    parser.add_argument("--prescale", action="store_true",
+                        help="Добавить отмасштабированные варианты для всех COMMON_RESOLUTIONS")
+    parser.add_argument("--resolution", type=parse_resolution, action="append", default=[],
+                        help="Добавить отмасштабированный вариант для разрешения ШИРИНАxВЫСОТА")
+    args = parser.parse_args(argv)
+
+    resolutions = list(args.resolution)
+    if args.prescale:
+        resolutions.extend(res for res in COMMON_RESOLUTIONS if res not in resolutions)
+    pack(args.output, resolutions)
+
+if __name__ == '__main__':
+    sys.exit(main())
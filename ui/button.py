@@ -2,43 +2,172 @@
 """Модуль для создания и отрисовки кнопок."""
 
 import pygame
+from ui.text_cache import render_text
+from utils.log import log
+from utils.sound_manager import sound_manager, CATEGORY_UI
+
+# Цвета неактивной (disabled) кнопки
+DISABLED_BACKGROUND = (100, 100, 100, 150)
+DISABLED_BORDER = (150, 150, 150, 150)
+DISABLED_TEXT_COLOR = (150, 150, 150)
 
 class Button:
-    # Статические переменные для хранения звука кнопки и настроек громкости
+    # Звук нажатия (устанавливается из main.py). Громкость задает группа звуков sound_manager
     click_sound = None
-    sfx_volume = 1.0 # Будет установлен из main.py
+    # Счетчик созданных кнопками поверхностей (для замеров до/после)
+    surface_allocations = 0
 
     def __init__(self, x, y, width, height, text, color, hover_color, font, text_color=(255, 255, 255), is_toggle=False):
-        self.rect = pygame.Rect(x, y, width, height)
-        self.text = text
-        self.color = color
-        self.hover_color = hover_color
-        self.font = font
-        self.text_color = text_color
-        self.text_surf = self.font.render(self.text, True, self.text_color)
-        self.text_rect = self.text_surf.get_rect(center=self.rect.center)
+        self._rect = pygame.Rect(x, y, width, height)
+        self._text = text
+        self._color = color
+        self._hover_color = hover_color
+        self._font = font
+        self._text_color = text_color
+        self._selected_color = None
+        self.text_surf = None
+        self.text_rect = None
         self.is_hovered = False
         self.is_toggled = False
         self.is_toggle = is_toggle
+        self.is_selected = False
+        self.is_disabled = False
+        # Заранее отрисованные состояния кнопки: ключ -> Surface
+        self._state_surfaces = {}
+        self._render_text()
 
-    def draw(self, surface):
-        # Создаем полупрозрачную поверхность для кнопки
-        button_surf = pygame.Surface((self.rect.width, self.rect.height), pygame.SRCALPHA)
-        color = self.hover_color if self.is_hovered else self.color
+    # --- Свойства, при изменении которых нужно перестроить внешний вид ---
+    @property
+    def rect(self):
+        return self._rect
+
+    @rect.setter
+    def rect(self, value):
+        old_size = self._rect.size
+        self._rect = pygame.Rect(value)
+        if self._rect.size != old_size:
+            self._state_surfaces = {}
+        self.text_rect = self.text_surf.get_rect(center=self._rect.center)
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, value):
+        if value != self._text:
+            self._text = value
+            self._render_text()
+
+    @property
+    def font(self):
+        return self._font
+
+    @font.setter
+    def font(self, value):
+        if value is not self._font:
+            self._font = value
+            self._render_text()
+
+    @property
+    def text_color(self):
+        return self._text_color
+
+    @text_color.setter
+    def text_color(self, value):
+        if value != self._text_color:
+            self._text_color = value
+            self._render_text()
+
+    @property
+    def color(self):
+        return self._color
+
+    @color.setter
+    def color(self, value):
+        if value != self._color:
+            self._color = value
+            self._state_surfaces = {}
+
+    @property
+    def hover_color(self):
+        return self._hover_color
+
+    @hover_color.setter
+    def hover_color(self, value):
+        if value != self._hover_color:
+            self._hover_color = value
+            self._state_surfaces = {}
+
+    @property
+    def selected_color(self):
+        return self._selected_color
+
+    @selected_color.setter
+    def selected_color(self, value):
+        if value != self._selected_color:
+            self._selected_color = value
+            self._state_surfaces = {}
+
+    def _render_text(self):
+        """Рендерит текст и сбрасывает кэш состояний."""
+        self.text_surf = render_text(self._font, self._text, self._text_color)
+        self.text_rect = self.text_surf.get_rect(center=self._rect.center)
+        self._state_surfaces = {}
+
+    def _current_state(self):
+        """Возвращает ключ текущего внешнего вида кнопки."""
+        if self.is_disabled:
+            return "disabled"
+        if self.is_hovered:
+            state = "hovered"
+        elif self.is_selected and self._selected_color is not None:
+            state = "selected"
+        else:
+            state = "normal"
         if self.is_toggle and self.is_toggled:
-            # Можно использовать другой цвет для выделения выбранного переключателя
-            color = tuple(min(255, c + 30) for c in color)
-        
-        # Рисуем прямоугольник с полупрозрачностью (например, 200 из 255)
-        pygame.draw.rect(button_surf, (*color, 200), (0, 0, self.rect.width, self.rect.height), border_radius=10)
-        pygame.draw.rect(button_surf, (255, 255, 255, 200), (0, 0, self.rect.width, self.rect.height), 2, border_radius=10)
-        
+            state += "_toggled"
+        return state
+
+    def _build_state_surface(self, state):
+        """Отрисовывает одно состояние кнопки в отдельную поверхность."""
+        width, height = self._rect.size
+        button_surf = pygame.Surface((width, height), pygame.SRCALPHA)
+        Button.surface_allocations += 1
+
+        if state == "disabled":
+            pygame.draw.rect(button_surf, DISABLED_BACKGROUND, (0, 0, width, height), border_radius=10)
+            pygame.draw.rect(button_surf, DISABLED_BORDER, (0, 0, width, height), 2, border_radius=10)
+            text_surf = render_text(self._font, self._text, DISABLED_TEXT_COLOR)
+        else:
+            if state.startswith("hovered"):
+                color = self._hover_color
+            elif state.startswith("selected"):
+                color = self._selected_color
+            else:
+                color = self._color
+            if state.endswith("_toggled"):
+                # Можно использовать другой цвет для выделения выбранного переключателя
+                color = tuple(min(255, c + 30) for c in color)
+
+            # Рисуем прямоугольник с полупрозрачностью (например, 200 из 255)
+            pygame.draw.rect(button_surf, (*color, 200), (0, 0, width, height), border_radius=10)
+            pygame.draw.rect(button_surf, (255, 255, 255, 200), (0, 0, width, height), 2, border_radius=10)
+            text_surf = self.text_surf
+
         # Рисуем текст
-        text_rect = self.text_surf.get_rect(center=(self.rect.width // 2, self.rect.height // 2))
-        button_surf.blit(self.text_surf, text_rect)
-        
-        # Отображаем полупрозрачную поверхность на основном экране
-        surface.blit(button_surf, self.rect)
+        text_rect = text_surf.get_rect(center=(width // 2, height // 2))
+        button_surf.blit(text_surf, text_rect)
+        return button_surf
+
+    def draw(self, surface):
+        # Состояние отрисовывается один раз, дальше - только один blit
+        state = self._current_state()
+        button_surf = self._state_surfaces.get(state)
+        if button_surf is None:
+            button_surf = self._build_state_surface(state)
+            self._state_surfaces[state] = button_surf
+        surface.blit(button_surf, self._rect)
 
     def check_hover(self, pos):
         """Проверяет, наведена ли мышь на кнопку."""
@@ -46,24 +175,23 @@ class Button:
         # Старая строка вызывала NameError:
         # if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
         #    ...
-        self.is_hovered = self.rect.collidepoint(pos)
+        # Возвращаем True, если состояние наведения изменилось (нужно для dirty rects)
+        was_hovered = self.is_hovered
+        self.is_hovered = bool(self.rect.collidepoint(pos))
+        return was_hovered != self.is_hovered
 
     def is_clicked(self, pos, event):
         """Проверяет, была ли кнопка кликнута."""
-        # Добавим отладочный вывод
-        print(f"Button.is_clicked вызван для кнопки '{self.text}'") # <-- Отладка
-        
+        log.debug("ui", "Button.is_clicked вызван для кнопки '%s'", self.text)
+
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
             if self.rect.collidepoint(pos):
                 # Воспроизводим звук, если он загружен
-                # Добавим отладочный вывод
                 if Button.click_sound:
-                    print(f"Попытка воспроизвести звук. Громкость SFX: {Button.sfx_volume}") # <-- Отладка
-                    Button.click_sound.set_volume(Button.sfx_volume)
-                    play_result = Button.click_sound.play()
-                    print(f"Звук воспроизведен. Результат: {play_result}") # <-- Отладка
+                    channel = sound_manager.play(Button.click_sound, CATEGORY_UI)
+                    log.debug("ui", "Звук кнопки воспроизведен на канале: %s", channel)
                 else:
-                    print("Звук не воспроизводится, так как Button.click_sound is None") # <-- Отладка
+                    log.debug("ui", "Звук не воспроизводится, так как Button.click_sound is None")
                 if self.is_toggle:
                     self.is_toggled = not self.is_toggled
                 return True
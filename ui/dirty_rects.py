@@ -0,0 +1,52 @@
+# ui/dirty_rects.py
+"""Модуль для отслеживания изменившихся областей экрана (dirty rectangles)."""
+
+import pygame
+
+class DirtyRectTracker:
+    """Собирает прямоугольники, которые сцена изменила с прошлого кадра."""
+
+    def __init__(self):
+        self.rects = []
+        # Пока флаг установлен, сцена требует полной перерисовки экрана
+        self.full_redraw = True
+
+    def mark(self, rect):
+        """Помечает область как изменившуюся."""
+        if rect is not None and not self.full_redraw:
+            self.rects.append(pygame.Rect(rect))
+
+    def mark_all(self):
+        """Помечает весь экран как изменившийся."""
+        self.full_redraw = True
+        self.rects = []
+
+    def has_changes(self):
+        """Есть ли что-то, что нужно перерисовать."""
+        return self.full_redraw or bool(self.rects)
+
+    def consume(self):
+        """
+        Возвращает изменившиеся области и очищает трекер.
+        None означает, что нужна полная перерисовка.
+        """
+        if self.full_redraw:
+            self.full_redraw = False
+            self.rects = []
+            return None
+        rects = merge_rects(self.rects)
+        self.rects = []
+        return rects
+
+def merge_rects(rects):
+    """Объединяет пересекающиеся прямоугольники, чтобы не рисовать одно место дважды."""
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        # Поглощаем все уже собранные области, которые пересекаются с текущей
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
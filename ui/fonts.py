@@ -0,0 +1,30 @@
+# ui/fonts.py
+"""Модуль общего реестра шрифтов."""
+
+import pygame
+
+# Размеры шрифтов, которые используют сцены (для прогрева во время заставки)
+UI_FONT_SIZES = (24, 28, 36, 40, 50, 60)
+
+_fonts = {} # (семейство, размер, жирный, курсив) -> pygame.font.Font
+
+def get_font(size, family=None, bold=False, italic=False):
+    """
+    Возвращает общий экземпляр шрифта. Каждый шрифт создается один раз за процесс,
+    повторные вызовы не открывают и не разбирают файл шрифта заново.
+    """
+    key = (family, size, bold, italic)
+    font = _fonts.get(key)
+    if font is None:
+        font = pygame.font.SysFont(family, size, bold, italic)
+        _fonts[key] = font
+    return font
+
+def warm_up(sizes=UI_FONT_SIZES, family=None):
+    """Заранее создает шрифты нужных размеров (например, пока показывается заставка)."""
+    for size in sizes:
+        get_font(size, family)
+
+def clear():
+    """Забывает все шрифты (например, после pygame.font.quit())."""
+    _fonts.clear()
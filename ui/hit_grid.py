@@ -0,0 +1,79 @@
+# ui/hit_grid.py
+"""Модуль для быстрого поиска виджета под точкой (наведение и клики)."""
+
+import pygame
+
+DEFAULT_CELL_SIZE = 64 # Размер ячейки сетки в пикселях
+
+class HitGrid:
+    """
+    Равномерная сетка по экрану: каждая ячейка хранит виджеты, чьи прямоугольники
+    её задевают. Поиск виджета под точкой проверяет только одну ячейку.
+    Сетку нужно перестраивать (rebuild) после изменения раскладки.
+    Виджеты, добавленные позже, рисуются поверх и при перекрытии выигрывают.
+    """
+
+    def __init__(self, cell_size=DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self._cells = {} # (столбец, строка) -> [(rect, виджет), ...]
+        self._widgets = []
+        self.hovered = None # Виджет под курсором (см. update_hover)
+
+    def __len__(self):
+        return len(self._widgets)
+
+    def clear(self):
+        self._cells = {}
+        self._widgets = []
+        self.hovered = None
+
+    def add(self, widget, rect=None):
+        """Добавляет виджет; по умолчанию используется widget.rect."""
+        rect = pygame.Rect(rect if rect is not None else widget.rect)
+        if rect.width <= 0 or rect.height <= 0:
+            return
+        entry = (rect, widget)
+        size = self.cell_size
+        for column in range(rect.left // size, (rect.right - 1) // size + 1):
+            for row in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                self._cells.setdefault((column, row), []).append(entry)
+        self._widgets.append(widget)
+
+    def rebuild(self, widgets):
+        """Перестраивает сетку по новому списку виджетов (порядок - порядок отрисовки)."""
+        hovered = self.hovered
+        self.clear()
+        for widget in widgets:
+            if widget is not None:
+                self.add(widget)
+        # Наведение сохраняется, только если виджет остался в раскладке
+        if any(widget is hovered for widget in self._widgets):
+            self.hovered = hovered
+
+    def hit(self, pos):
+        """Возвращает верхний виджет под точкой pos или None."""
+        size = self.cell_size
+        entries = self._cells.get((pos[0] // size, pos[1] // size))
+        if entries:
+            for rect, widget in reversed(entries):
+                if rect.collidepoint(pos):
+                    return widget
+        return None
+
+    def update_hover(self, pos):
+        """
+        Переносит наведение (is_hovered) на виджет под курсором.
+        Возвращает виджеты, у которых оно изменилось (для отметки областей перерисовки).
+        """
+        widget = self.hit(pos)
+        if widget is self.hovered:
+            return ()
+        changed = []
+        if self.hovered is not None:
+            self.hovered.is_hovered = False
+            changed.append(self.hovered)
+        if widget is not None:
+            widget.is_hovered = True
+            changed.append(widget)
+        self.hovered = widget
+        return changed
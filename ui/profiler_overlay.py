@@ -0,0 +1,94 @@
+# ui/profiler_overlay.py
+"""Модуль для отображения графика времени кадра поверх игры."""
+
+import pygame
+from ui import fonts
+from utils.profiler import FRAME, WORK_PHASES, PERCENTILES
+
+OVERLAY_WIDTH = 320
+GRAPH_HEIGHT = 80
+TEXT_LINES = 2
+LINE_HEIGHT = 18
+OVERLAY_MARGIN = 10
+GRAPH_SCALE_MS = 33.3 # Высота графика соответствует двум кадрам при 60 FPS
+BUDGET_MS = 1000 / 60
+STATS_REFRESH_MS = 250 # Статистика пересчитывается не каждый кадр
+
+BACKGROUND_COLOR = (0, 0, 0, 180)
+BUDGET_LINE_COLOR = (200, 60, 60)
+TEXT_COLOR = (220, 220, 220)
+PHASE_COLORS = {
+    "events": (90, 160, 230),
+    "update": (110, 200, 110),
+    "draw": (230, 190, 70),
+    "flip": (200, 110, 220),
+}
+
+class ProfilerOverlay:
+    """
+    График времени кадра активной сцены (столбик на кадр, по цветам фаз)
+    и строка с p50/p95/p99 и худшим кадром.
+    """
+
+    def __init__(self, profiler, x=OVERLAY_MARGIN, y=OVERLAY_MARGIN):
+        self.profiler = profiler
+        self.visible = False
+        height = GRAPH_HEIGHT + TEXT_LINES * LINE_HEIGHT + 6
+        self.rect = pygame.Rect(x, y, OVERLAY_WIDTH, height)
+        self.surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        self._font = fonts.get_font(LINE_HEIGHT)
+        self._text_surfaces = []
+        self._last_stats_time = -STATS_REFRESH_MS
+        self._stats_scene = None
+
+    def toggle(self):
+        self.visible = not self.visible
+        self._last_stats_time = -STATS_REFRESH_MS
+
+    def _refresh_text(self, scene_id):
+        stats = self.profiler.stats(scene_id).get(FRAME)
+        if stats is None:
+            lines = [f"{scene_id}: нет данных"]
+        else:
+            _, _, *values = stats
+            p_values = " ".join(f"p{p} {value * 1000:.1f}" for p, value in zip(PERCENTILES, values))
+            worst_total, worst_frame = self.profiler.worst[scene_id]
+            worst_phase = max(WORK_PHASES, key=worst_frame.get)
+            lines = [f"{scene_id}: {p_values} мс",
+                     f"худший {worst_total * 1000:.1f} мс ({worst_phase} {worst_frame[worst_phase] * 1000:.1f})"]
+        self._text_surfaces = [self._font.render(line, True, TEXT_COLOR) for line in lines]
+
+    def _draw_graph(self, scene_id):
+        surface = self.surface
+        history = {phase: self.profiler.history(scene_id, phase) for phase in WORK_PHASES}
+        count = min(len(history[WORK_PHASES[0]]), OVERLAY_WIDTH)
+        scale = GRAPH_HEIGHT / GRAPH_SCALE_MS
+        bottom = GRAPH_HEIGHT
+        start = len(history[WORK_PHASES[0]]) - count
+        for i in range(count):
+            x = OVERLAY_WIDTH - count + i
+            y = bottom
+            for phase in WORK_PHASES:
+                height = history[phase][start + i] * 1000 * scale
+                if height >= 1:
+                    top = max(0, y - int(height))
+                    surface.fill(PHASE_COLORS[phase], (x, top, 1, y - top))
+                    y = top
+        budget_y = bottom - int(BUDGET_MS * scale)
+        surface.fill(BUDGET_LINE_COLOR, (0, budget_y, OVERLAY_WIDTH, 1))
+
+    def draw(self, screen, scene_id):
+        if not self.visible:
+            return
+        now = pygame.time.get_ticks()
+        if now - self._last_stats_time >= STATS_REFRESH_MS or scene_id != self._stats_scene:
+            self._refresh_text(scene_id)
+            self._last_stats_time = now
+            self._stats_scene = scene_id
+        self.surface.fill(BACKGROUND_COLOR)
+        self._draw_graph(scene_id)
+        y = GRAPH_HEIGHT + 4
+        for text_surface in self._text_surfaces:
+            self.surface.blit(text_surface, (4, y))
+            y += LINE_HEIGHT
+        screen.blit(self.surface, self.rect)
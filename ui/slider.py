@@ -0,0 +1,139 @@
+# ui/slider.py
+"""Модуль для ползунка (например, громкости)."""
+
+import pygame
+
+TRACK_THICKNESS = 6
+
+# Цвета ползунка по умолчанию
+DEFAULT_COLORS = {
+    "track": (60, 60, 60, 200),
+    "fill": (255, 215, 0, 220),
+    "border": (255, 255, 255, 200),
+    "knob": (220, 220, 220),
+    "knob_active": (255, 255, 255),
+}
+
+class Slider:
+    """
+    Горизонтальный ползунок со значением от 0.0 до 1.0.
+    Дорожка и бегунок отрисовываются один раз; перетаскивание только меняет
+    координаты blit, новых поверхностей при этом не создается.
+    """
+
+    def __init__(self, x, y, width, height, value=0.0, colors=None, step=0.01, on_change=None):
+        self._rect = pygame.Rect(x, y, width, height)
+        self.colors = dict(DEFAULT_COLORS, **(colors or {}))
+        self.step = step # Значение округляется до шага (для процентов - 0.01)
+        self.on_change = on_change # Вызывается с новым значением при перетаскивании
+        self.value = self._snap(value)
+        self.is_hovered = False
+        self.is_dragging = False
+
+        self._track_surface = None
+        self._fill_surface = None
+        self._knob_surfaces = {} # активен ли бегунок -> Surface
+
+    @property
+    def rect(self):
+        return self._rect
+
+    @rect.setter
+    def rect(self, value):
+        old_size = self._rect.size
+        self._rect = pygame.Rect(value)
+        if self._rect.size != old_size:
+            self._track_surface = None
+            self._fill_surface = None
+            self._knob_surfaces = {}
+
+    @property
+    def knob_radius(self):
+        return self._rect.height // 2
+
+    def _snap(self, value):
+        value = max(0.0, min(1.0, value))
+        if self.step:
+            value = round(round(value / self.step) * self.step, 4)
+        return value
+
+    def _knob_center_x(self):
+        radius = self.knob_radius
+        return self._rect.x + radius + round(self.value * (self._rect.width - 2 * radius))
+
+    def _value_from_x(self, x):
+        radius = self.knob_radius
+        span = self._rect.width - 2 * radius
+        if span <= 0:
+            return self.value
+        return self._snap((x - self._rect.x - radius) / span)
+
+    def set_value(self, value):
+        """Устанавливает значение извне (без вызова on_change). Возвращает True, если оно изменилось."""
+        value = self._snap(value)
+        if value == self.value:
+            return False
+        self.value = value
+        return True
+
+    def _drag_to(self, x):
+        if self.set_value(self._value_from_x(x)) and self.on_change:
+            self.on_change(self.value)
+        return True
+
+    def check_hover(self, pos):
+        """Проверяет наведение. Возвращает True, если состояние изменилось."""
+        was_hovered = self.is_hovered
+        self.is_hovered = bool(self._rect.collidepoint(pos))
+        return was_hovered != self.is_hovered
+
+    def handle_event(self, event):
+        """Обрабатывает мышь. Возвращает True, если внешний вид ползунка изменился."""
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            if self._rect.collidepoint(event.pos):
+                self.is_dragging = True
+                return self._drag_to(event.pos[0])
+        elif event.type == pygame.MOUSEMOTION and self.is_dragging:
+            old_value = self.value
+            self._drag_to(event.pos[0])
+            return self.value != old_value
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1 and self.is_dragging:
+            self.is_dragging = False
+            return True
+        return False
+
+    # --- Отрисовка ---
+    def _build_track(self, color):
+        width = self._rect.width - 2 * self.knob_radius
+        surface = pygame.Surface((max(1, width), TRACK_THICKNESS), pygame.SRCALPHA)
+        pygame.draw.rect(surface, color, surface.get_rect(), border_radius=TRACK_THICKNESS // 2)
+        pygame.draw.rect(surface, self.colors["border"], surface.get_rect(), 1, border_radius=TRACK_THICKNESS // 2)
+        return surface
+
+    def _get_knob_surface(self, active):
+        knob = self._knob_surfaces.get(active)
+        if knob is None:
+            radius = self.knob_radius
+            knob = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            color = self.colors["knob_active"] if active else self.colors["knob"]
+            pygame.draw.circle(knob, color, (radius, radius), radius)
+            pygame.draw.circle(knob, self.colors["border"], (radius, radius), radius, 1)
+            self._knob_surfaces[active] = knob
+        return knob
+
+    def draw(self, surface):
+        if self._track_surface is None:
+            self._track_surface = self._build_track(self.colors["track"])
+            self._fill_surface = self._build_track(self.colors["fill"])
+
+        radius = self.knob_radius
+        track_pos = (self._rect.x + radius, self._rect.centery - TRACK_THICKNESS // 2)
+        surface.blit(self._track_surface, track_pos)
+        # Заполненная часть - это та же заранее отрисованная дорожка, обрезанная по значению
+        knob_x = self._knob_center_x()
+        fill_width = knob_x - track_pos[0]
+        if fill_width > 0:
+            surface.blit(self._fill_surface, track_pos, (0, 0, fill_width, TRACK_THICKNESS))
+
+        knob = self._get_knob_surface(self.is_hovered or self.is_dragging)
+        surface.blit(knob, (knob_x - radius, self._rect.centery - radius))
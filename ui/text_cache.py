@@ -0,0 +1,56 @@
+# ui/text_cache.py
+"""Модуль для кэширования отрендеренного текста."""
+
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 512
+
+class TextCache:
+    """
+    Кэш поверхностей font.render с ключом (шрифт, текст, цвет, сглаживание).
+    Ограничен по количеству записей, лишние вытесняются по LRU.
+    Полученные поверхности общие - рисовать на них нельзя.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        # Статистика: в установившемся режиме промахов (растеризации глифов) быть не должно
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        """Возвращает поверхность с текстом, рендеря её только при первом запросе."""
+        key = (font, text, tuple(color), antialias)
+        surface = self._entries.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._entries[key] = surface
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return surface
+
+    def clear(self):
+        """Очищает кэш (например, при смене языка)."""
+        self._entries.clear()
+
+    def reset_stats(self):
+        """Сбрасывает счетчики попаданий и промахов."""
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """Возвращает статистику кэша."""
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+# Общий для всех сцен кэш
+text_cache = TextCache()
+
+def render_text(font, text, color, antialias=True):
+    """Рендерит текст через общий кэш."""
+    return text_cache.render(font, text, color, antialias)
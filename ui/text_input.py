@@ -0,0 +1,288 @@
+# ui/text_input.py
+"""Модуль для поля ввода текста."""
+
+from bisect import bisect_left
+import pygame
+from ui.text_cache import render_text
+
+PADDING = 10 # Отступ текста от левого и правого края поля
+CARET_WIDTH = 2
+
+# Цвета поля по умолчанию
+DEFAULT_COLORS = {
+    "background": (50, 50, 50, 200),
+    "border": (100, 100, 100),
+    "border_active": (255, 215, 0),
+    "text": (255, 255, 255),
+    "placeholder": (150, 150, 150),
+}
+
+class TextInput:
+    """
+    Однострочное поле ввода. Смещения символов измеряются один раз на правку текста,
+    поэтому перемещение курсора и прокрутка не измеряют текст. Текст растеризуется
+    заново только при изменении текста, IME-композиции или фокуса.
+    """
+
+    def __init__(self, x, y, width, height, font, colors=None, placeholder="",
+                 max_length=None, allow_leading_space=True, on_submit=None):
+        self._rect = pygame.Rect(x, y, width, height)
+        self.font = font
+        self.colors = dict(DEFAULT_COLORS, **(colors or {}))
+        self._placeholder = placeholder
+        self.max_length = max_length
+        self.allow_leading_space = allow_leading_space
+        self.on_submit = on_submit # Вызывается с текстом по нажатию Enter
+
+        self._text = ""
+        self._offsets = [0] # _offsets[i] - ширина первых i символов
+        self.caret = 0
+        self.scroll_x = 0
+        self.composition = "" # Незавершенный ввод IME (TEXTEDITING)
+        self._is_active = False
+
+        self._frame_surfaces = {} # Фон с рамкой: активно ли поле -> Surface
+        self._text_surface = None
+        self._text_surface_offset = 0 # Сдвиг растеризованного текста внутри поля
+
+    # --- Свойства ---
+    @property
+    def rect(self):
+        return self._rect
+
+    @rect.setter
+    def rect(self, value):
+        old_size = self._rect.size
+        self._rect = pygame.Rect(value)
+        if self._rect.size != old_size:
+            self._frame_surfaces = {}
+            self._scroll_to_caret()
+        self._update_ime_rect()
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, value):
+        if value != self._text:
+            self._text = value
+            self._measure_offsets()
+            self.caret = len(value)
+            self._text_changed()
+
+    @property
+    def placeholder(self):
+        return self._placeholder
+
+    @placeholder.setter
+    def placeholder(self, value):
+        if value != self._placeholder:
+            self._placeholder = value
+            self._text_surface = None
+
+    @property
+    def is_active(self):
+        return self._is_active
+
+    @is_active.setter
+    def is_active(self, value):
+        if value != self._is_active:
+            self._is_active = value
+            if not value:
+                self.composition = ""
+            self._text_surface = None
+            self._update_ime_rect()
+
+    @property
+    def inner_width(self):
+        return max(0, self._rect.width - 2 * PADDING)
+
+    # --- Редактирование ---
+    def _measure_offsets(self):
+        """
+        Пересчитывает ширину каждого префикса текста. Префиксы измеряются целиком:
+        сумма ширин отдельных символов не учитывает кернинг, и курсор уходил бы от глифов.
+        """
+        self._offsets = [0] + [self.font.size(self._text[:i])[0] for i in range(1, len(self._text) + 1)]
+
+    def _text_changed(self):
+        self._text_surface = None
+        self._scroll_to_caret()
+        self._update_ime_rect()
+
+    def _caret_x(self):
+        """Смещение курсора от начала текста (с учетом IME-композиции)."""
+        x = self._offsets[self.caret]
+        if self.composition:
+            x += self.font.size(self.composition)[0]
+        return x
+
+    def _scroll_to_caret(self):
+        """Прокручивает текст так, чтобы курсор оставался видимым."""
+        caret_x = self._caret_x()
+        if caret_x < self.scroll_x:
+            self.scroll_x = caret_x
+        elif caret_x - self.scroll_x > self.inner_width:
+            self.scroll_x = caret_x - self.inner_width
+        # Не оставляем пустого места справа, если текст стал короче
+        content_width = self._offsets[-1] + (self._caret_x() - self._offsets[self.caret])
+        self.scroll_x = max(0, min(self.scroll_x, content_width - self.inner_width))
+
+    def _update_ime_rect(self):
+        """Сообщает IME, где показывать окно кандидатов."""
+        if self._is_active:
+            pygame.key.set_text_input_rect(self._rect)
+
+    def insert(self, text):
+        """Вставляет текст в позицию курсора с учетом ограничений поля."""
+        chars = []
+        length = len(self._text)
+        for char in text:
+            if self.max_length is not None and length + len(chars) >= self.max_length:
+                break
+            if not char.isprintable():
+                continue
+            if char == " " and not self.allow_leading_space and self.caret == 0 and not chars:
+                continue
+            chars.append(char)
+        if not chars:
+            return False
+
+        inserted = "".join(chars)
+        self._text = self._text[:self.caret] + inserted + self._text[self.caret:]
+        self._measure_offsets()
+        self.caret += len(chars)
+        self._text_changed()
+        return True
+
+    def delete(self, start, end):
+        """Удаляет символы [start, end)."""
+        start = max(0, start)
+        end = min(len(self._text), end)
+        if start >= end:
+            return False
+        self._text = self._text[:start] + self._text[end:]
+        self._measure_offsets()
+        self.caret = start
+        if not self.allow_leading_space and self._text.startswith(" "):
+            # Удаление первого символа не должно оставлять пробел в начале
+            stripped = len(self._text) - len(self._text.lstrip(" "))
+            return self.delete(0, stripped) or True
+        self._text_changed()
+        return True
+
+    def move_caret(self, position):
+        """Перемещает курсор. Текст при этом не растеризуется заново."""
+        position = max(0, min(len(self._text), position))
+        if position == self.caret:
+            return False
+        self.caret = position
+        self._scroll_to_caret()
+        return True
+
+    def caret_from_x(self, x):
+        """Возвращает позицию курсора, ближайшую к координате X на экране."""
+        local_x = x - self._rect.x - PADDING + self.scroll_x
+        index = bisect_left(self._offsets, local_x)
+        if index >= len(self._offsets):
+            return len(self._text)
+        if index > 0 and local_x - self._offsets[index - 1] < self._offsets[index] - local_x:
+            index -= 1
+        return index
+
+    def handle_event(self, event):
+        """
+        Обрабатывает событие. Возвращает True, если внешний вид поля изменился.
+        Печатные символы приходят через TEXTINPUT, клавиши редактирования - через KEYDOWN.
+        """
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            was_active = self._is_active
+            self.is_active = self._rect.collidepoint(event.pos)
+            moved = self._is_active and self.move_caret(self.caret_from_x(event.pos[0]))
+            return was_active != self._is_active or moved
+
+        if not self._is_active:
+            return False
+
+        if event.type == pygame.TEXTINPUT:
+            self.composition = ""
+            return self.insert(event.text)
+        if event.type == pygame.TEXTEDITING:
+            if event.text != self.composition:
+                self.composition = event.text
+                self._text_changed()
+                return True
+            return False
+        if event.type != pygame.KEYDOWN or self.composition:
+            # Пока идет IME-композиция, клавиши редактирования обрабатывает IME
+            return False
+
+        if event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
+            if self.on_submit:
+                self.on_submit(self._text)
+            return True
+        if event.key == pygame.K_BACKSPACE:
+            return self.delete(self.caret - 1, self.caret)
+        if event.key == pygame.K_DELETE:
+            return self.delete(self.caret, self.caret + 1)
+        if event.key == pygame.K_LEFT:
+            return self.move_caret(self.caret - 1)
+        if event.key == pygame.K_RIGHT:
+            return self.move_caret(self.caret + 1)
+        if event.key == pygame.K_HOME:
+            return self.move_caret(0)
+        if event.key == pygame.K_END:
+            return self.move_caret(len(self._text))
+        return False
+
+    # --- Отрисовка ---
+    def _get_frame_surface(self):
+        """Фон и рамка поля рисуются один раз для каждого состояния фокуса."""
+        frame = self._frame_surfaces.get(self._is_active)
+        if frame is None:
+            width, height = self._rect.size
+            frame = pygame.Surface((width, height), pygame.SRCALPHA)
+            pygame.draw.rect(frame, self.colors["background"], (0, 0, width, height), border_radius=5)
+            border_color = self.colors["border_active"] if self._is_active else self.colors["border"]
+            pygame.draw.rect(frame, border_color, (0, 0, width, height), 2, border_radius=5)
+            self._frame_surfaces[self._is_active] = frame
+        return frame
+
+    def _get_text_surface(self):
+        """Растеризует текст (или плейсхолдер) вместе с IME-композицией."""
+        if self._text_surface is None:
+            if not self._text and not self.composition and not self._is_active:
+                # Плейсхолдер один и тот же, его можно брать из общего кэша
+                self._text_surface = render_text(self.font, self._placeholder, self.colors["placeholder"])
+            elif self.composition:
+                before = self.font.render(self._text[:self.caret], True, self.colors["text"])
+                composing = self.font.render(self.composition, True, self.colors["text"])
+                after = self.font.render(self._text[self.caret:], True, self.colors["text"])
+                height = self.font.get_height()
+                surface = pygame.Surface((before.get_width() + composing.get_width() + after.get_width(), height),
+                                         pygame.SRCALPHA)
+                surface.blit(before, (0, 0))
+                surface.blit(composing, (before.get_width(), 0))
+                surface.blit(after, (before.get_width() + composing.get_width(), 0))
+                # Подчеркиваем незавершенный ввод
+                pygame.draw.line(surface, self.colors["text"], (before.get_width(), height - 2),
+                                 (before.get_width() + composing.get_width(), height - 2))
+                self._text_surface = surface
+            else:
+                # Введенный текст уникален, поэтому не засоряем им общий кэш
+                self._text_surface = self.font.render(self._text, True, self.colors["text"])
+        return self._text_surface
+
+    def draw(self, surface):
+        surface.blit(self._get_frame_surface(), self._rect)
+
+        text_surface = self._get_text_surface()
+        text_y = self._rect.centery - text_surface.get_height() // 2
+        visible = pygame.Rect(self.scroll_x, 0, self.inner_width, text_surface.get_height())
+        surface.blit(text_surface, (self._rect.x + PADDING, text_y), visible)
+
+        if self._is_active:
+            caret_x = self._rect.x + PADDING + self._caret_x() - self.scroll_x
+            pygame.draw.rect(surface, self.colors["text"],
+                             (caret_x, text_y, CARET_WIDTH, text_surface.get_height()))
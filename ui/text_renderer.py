@@ -1,42 +1,110 @@
 # ui/text_renderer.py
 """Модуль для вспомогательных функций отрисовки текста."""
 
-import pygame
+from collections import OrderedDict
+from ui.text_cache import render_text
+
+LINE_SPACING = 3 # Пиксели между строками
+LAYOUT_CACHE_SIZE = 256
+# На сколько пикселей кернинг на одном стыке "слово-пробел-слово" может расширить строку
+KERNING_SLACK = 2
+
+# Ширина слов для каждого шрифта: шрифт -> {слово: ширина}
+_word_widths = {}
+# Готовые разбиения абзацев: (текст, шрифт, ширина) -> TextLayout
+_layout_cache = OrderedDict()
+
+class TextLayout:
+    """Результат разбиения текста на строки: строки и их метрики, без растеризации."""
+
+    def __init__(self, font, lines, widths, line_height):
+        self.font = font
+        self.lines = lines           # Список строк
+        self.widths = widths         # Ширина каждой строки в пикселях
+        self.line_height = line_height # Высота строки шрифта (без межстрочного интервала)
+
+    @property
+    def width(self):
+        return max(self.widths, default=0)
+
+    def height(self, line_spacing=LINE_SPACING):
+        """Высота всего текста с учетом межстрочного интервала."""
+        return len(self.lines) * (self.line_height + line_spacing)
+
+def measure_word(font, word):
+    """Возвращает ширину слова, измеряя его только один раз для каждого шрифта."""
+    widths = _word_widths.get(font)
+    if widths is None:
+        widths = _word_widths[font] = {}
+    width = widths.get(word)
+    if width is None:
+        width = widths[word] = font.size(word)[0]
+    return width
+
+def layout_text(text, font, max_width):
+    """
+    Разбивает текст на строки не шире max_width. Каждое слово измеряется один раз,
+    поэтому время линейно по длине текста. Результат кэшируется по (текст, шрифт, ширина).
+    """
+    key = (text, font, max_width)
+    layout = _layout_cache.get(key)
+    if layout is not None:
+        _layout_cache.move_to_end(key)
+        return layout
+
+    layout = _break_lines(text, font, max_width)
+    _layout_cache[key] = layout
+    if len(_layout_cache) > LAYOUT_CACHE_SIZE:
+        _layout_cache.popitem(last=False)
+    return layout
+
+def _break_lines(text, font, max_width):
+    space_width = measure_word(font, " ")
+    lines = []
+    # Явные переводы строк сохраняем, каждый абзац переносим отдельно
+    for paragraph in text.split("\n"):
+        current_words = []
+        current_width = 0
+        # Как и раньше, слова разделяются только пробелами
+        for word in paragraph.split(" "):
+            word_width = measure_word(font, word)
+            line_width = current_width + space_width + word_width
+            if current_words and line_width <= max_width:
+                # Сумма ширин не учитывает кернинг на стыках: у самой границы проверяем строку целиком
+                if line_width > max_width - KERNING_SLACK * len(current_words):
+                    line_width = font.size(" ".join(current_words + [word]))[0]
+                if line_width <= max_width:
+                    current_words.append(word)
+                    current_width = line_width
+                    continue
+            if current_words:
+                lines.append(" ".join(current_words))
+            # Если слово слишком длинное, оно все равно занимает отдельную строку
+            current_words = [word]
+            current_width = word_width
+        lines.append(" ".join(current_words))
+
+    # Сумма ширин слов не учитывает кернинг на стыках, поэтому
+    # итоговую ширину каждой строки измеряем целиком (один проход по тексту)
+    widths = [font.size(line)[0] if line else 0 for line in lines]
+    return TextLayout(font, lines, widths, font.get_height())
+
+def render_layout(layout, color=(255, 255, 255)):
+    """Растеризует строки разбиения (через общий кэш текста)."""
+    return [render_text(layout.font, line, color) for line in layout.lines]
 
 def wrap_text(text, font, max_width, color=(255, 255, 255)):
     """
     Разбивает текст на строки, чтобы они помещались в заданную ширину.
     Возвращает список строк Surface указанного цвета.
     """
-    words = text.split(' ')
-    lines = []
-    current_line = ""
-
-    for word in words:
-        test_line = current_line + word + " "
-        # Получаем ширину тестовой строки
-        if font.size(test_line)[0] > max_width:
-            if current_line: # Если текущая строка не пуста, добавляем её
-                lines.append(current_line)
-                current_line = word + " "
-            else: # Если слово слишком длинное, помещаем его в отдельную строку
-                lines.append(word)
-                current_line = ""
-        else:
-            current_line = test_line
-
-    if current_line: # Добавляем последнюю строку
-        lines.append(current_line.strip())
-
-    # Преобразуем строки в Surface указанного цвета
-    surfaces = [font.render(line, True, color) for line in lines]
-    return surfaces
+    return render_layout(layout_text(text, font, max_width), color)
 
 def draw_wrapped_text(surface, text_surfaces, x, y, line_height=None):
     """Отрисовывает список строк Surface на заданной позиции."""
     if not line_height and text_surfaces:
         # Получаем высоту строки из первой поверхности, если не задана
-        line_height = text_surfaces[0].get_height() + 3 # +3 пикселя между строками
+        line_height = text_surfaces[0].get_height() + LINE_SPACING
     elif not line_height:
         line_height = 20 # fallback
 
@@ -0,0 +1,147 @@
+# utils/asset_archive.py
+"""Модуль для упакованного архива изображений, отображаемого в память (mmap)."""
+
+import json
+import mmap
+import os
+import struct
+import pygame
+from utils.log import log
+
+ARCHIVE_MAGIC = b"MRZPAK01"
+# Заголовок: сигнатура, длина JSON-индекса и начало блока данных (little-endian)
+HEADER_FORMAT = "<8sIQ"
+# Данные каждого изображения выравниваются по 64 байта (строка кэша)
+DATA_ALIGNMENT = 64
+# Порядок байт пикселя совпадает с 32-битным форматом дисплея (ARGB8888 в памяти - B, G, R, A)
+PIXEL_LAYOUT = "BGRA"
+
+def archive_key(path, size=None, pixel_format="alpha", fit="exact"):
+    """Ключ изображения в архиве (совпадает по смыслу с ключом AssetManager)."""
+    path = path.replace(os.sep, "/")
+    if size is None:
+        return f"{path}|{pixel_format}"
+    return f"{path}|{pixel_format}|{size[0]}x{size[1]}|{fit}"
+
+def source_signature(path):
+    """Отпечаток исходного файла: по нему определяется, не устарел ли архив."""
+    stat = os.stat(path)
+    return [int(stat.st_mtime), stat.st_size]
+
+class AssetArchive:
+    """
+    Архив с заранее декодированными пикселями. Файл отображается в память,
+    и поверхности создаются прямо поверх отображенных байт - без декодирования PNG
+    и без копирования в кучу.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._file = open(file_path, "rb")
+        try:
+            # ACCESS_COPY: если кто-то нарисует на такой поверхности, изменится только его копия страницы
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_COPY)
+            magic, index_length, self._data_start = struct.unpack_from(HEADER_FORMAT, self._map, 0)
+            if magic != ARCHIVE_MAGIC:
+                raise ValueError(f"Неверная сигнатура архива: {magic!r}")
+            index_start = struct.calcsize(HEADER_FORMAT)
+            index = json.loads(self._map[index_start:index_start + index_length].decode("utf-8"))
+        except Exception:
+            self.close()
+            raise
+        self.entries = index["entries"]
+        self.sources = index["sources"]
+        self._view = memoryview(self._map)
+        self._stale_sources = set()
+
+    @classmethod
+    def open(cls, file_path):
+        """Открывает архив, если он есть. При ошибке возвращает None."""
+        if not os.path.exists(file_path):
+            return None
+        try:
+            archive = cls(file_path)
+        except (OSError, ValueError, KeyError, struct.error) as e:
+            log.warning("assets", "Не удалось открыть архив ресурсов '%s': %s", file_path, e)
+            return None
+        archive._check_sources()
+        log.info("assets", "Архив ресурсов '%s' подключен: %d изображений.", file_path, len(archive.entries))
+        return archive
+
+    def _check_sources(self):
+        """Исходники, измененные после упаковки, берутся с диска, а не из архива."""
+        for path, signature in self.sources.items():
+            if os.path.exists(path) and source_signature(path) != signature:
+                log.warning("assets", "Архив ресурсов устарел для '%s', будет использован исходный файл.", path)
+                self._stale_sources.add(path)
+
+    def has_image(self, key):
+        """Есть ли в архиве актуальное изображение с таким ключом."""
+        entry = self.entries.get(key)
+        return entry is not None and entry["source"] not in self._stale_sources
+
+    def load_image(self, key):
+        """Возвращает поверхность поверх отображенных байт или None, если ключа нет."""
+        if not self.has_image(key):
+            return None
+        entry = self.entries[key]
+        width, height = entry["size"]
+        offset = self._data_start + entry["offset"]
+        pixels = self._view[offset:offset + width * height * 4]
+        image = pygame.image.frombuffer(pixels, (width, height), PIXEL_LAYOUT)
+        if not entry["alpha"]:
+            # Непрозрачное изображение копируется при отрисовке без смешивания
+            image.set_alpha(None)
+        return image
+
+    def close(self):
+        """Закрывает архив (поверхности из него после этого использовать нельзя)."""
+        if getattr(self, "_map", None) is not None:
+            try:
+                if getattr(self, "_view", None) is not None:
+                    self._view.release()
+                self._map.close()
+            except BufferError:
+                pass # На отображение еще ссылаются поверхности - его закроет сборщик мусора
+        self._file.close()
+
+def write_archive(file_path, images, sources):
+    """
+    Записывает архив. images - список (ключ, поверхность, есть_ли_прозрачность, исходный_файл),
+    sources - исходные файлы, отпечатки которых сохраняются в индексе.
+    """
+    entries = {}
+    offset = 0 # Смещения в индексе отсчитываются от начала блока данных
+    for key, surface, has_alpha, source in images:
+        width, height = surface.get_size()
+        entries[key] = {
+            "offset": offset,
+            "size": list(surface.get_size()),
+            "alpha": has_alpha,
+            "source": source.replace(os.sep, "/"),
+        }
+        offset += _aligned(width * height * 4)
+
+    index = {
+        "entries": entries,
+        "sources": {path.replace(os.sep, "/"): source_signature(path) for path in sources},
+    }
+    index_bytes = json.dumps(index, ensure_ascii=False).encode("utf-8")
+    header_size = struct.calcsize(HEADER_FORMAT)
+    data_start = _aligned(header_size + len(index_bytes))
+
+    # Пишем во временный файл и подменяем архив целиком, чтобы не оставить его недописанным
+    temp_path = file_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(struct.pack(HEADER_FORMAT, ARCHIVE_MAGIC, len(index_bytes), data_start))
+        f.write(index_bytes)
+        f.write(b"\0" * (data_start - header_size - len(index_bytes)))
+        for _, surface, _, _ in images:
+            # Пиксели сериализуются по одному изображению, чтобы не держать весь архив в памяти
+            data = pygame.image.tobytes(surface, PIXEL_LAYOUT)
+            f.write(data)
+            f.write(b"\0" * (_aligned(len(data)) - len(data)))
+    os.replace(temp_path, file_path)
+
+def _aligned(length):
+    return (length + DATA_ALIGNMENT - 1) // DATA_ALIGNMENT * DATA_ALIGNMENT
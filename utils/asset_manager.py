@@ -0,0 +1,282 @@
+# utils/asset_manager.py
+"""Модуль централизованной загрузки и кэширования медиафайлов."""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+from utils.asset_archive import archive_key
+from utils.log import log
+
+# Форматы пикселей, в которые переводятся изображения
+FORMAT_OPAQUE = "opaque" # convert() - без прозрачности, быстрее всего рисуется
+FORMAT_ALPHA = "alpha"   # convert_alpha() - с попиксельной прозрачностью
+
+# Режимы вписывания изображения в целевой размер
+FIT_EXACT = "exact"     # Растянуть ровно до размера
+FIT_COVER = "cover"     # Покрыть весь размер, сохраняя пропорции (лишнее выходит за края)
+FIT_CONTAIN = "contain" # Вписать целиком, сохраняя пропорции
+
+DEFAULT_MEMORY_BUDGET_MB = 256
+LOADER_THREADS = 2 # Потоки для фоновой загрузки
+
+class AssetManager:
+    """
+    Кэш изображений и звуков с ключом (путь, целевой размер, формат пикселей).
+    Считает, сколько байт занимает каждый ресурс, и при превышении бюджета
+    вытесняет давно не использованные (LRU).
+
+    Ресурсы можно заранее загрузить в фоне (preload_*): декодирование идет в
+    рабочих потоках, а convert()/convert_alpha() выполняется в главном потоке в poll().
+
+    Если подключен архив ресурсов (attach_archive), изображения берутся из него
+    без декодирования: поверхности создаются поверх отображенного в память файла.
+    """
+
+    def __init__(self, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self.used_bytes = 0
+        self._entries = OrderedDict() # ключ -> (ресурс, размер в байтах)
+        self._lock = threading.RLock()
+        self._pending = {} # ключ -> Future с результатом фоновой загрузки
+        self._executor = None # Создается при первой фоновой загрузке
+        self._archive = None # Упакованный архив изображений (AssetArchive)
+
+    def attach_archive(self, archive):
+        """Подключает упакованный архив, из которого изображения берутся в первую очередь."""
+        with self._lock:
+            self._archive = archive
+
+    def set_memory_budget(self, memory_budget_mb):
+        """Меняет бюджет памяти и сразу вытесняет лишнее."""
+        with self._lock:
+            self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+            self._evict()
+
+    # --- Изображения ---
+    def load_image(self, path, size=None, pixel_format=FORMAT_ALPHA, fit=FIT_EXACT):
+        """
+        Возвращает изображение, переведенное в формат дисплея и (если задан size)
+        отмасштабированное в режиме fit. Повторные вызовы отдают тот же объект.
+        """
+        key = self._image_key(path, size, pixel_format, fit)
+        image = self._get(key)
+        if image is not None:
+            return image
+
+        future = self._pop_pending(key)
+        if future is not None:
+            # Ресурс уже грузится в фоне - дожидаемся его, а не декодируем повторно
+            return self._finalize(key, future.result())
+
+        image = self._load_from_archive(path, size, pixel_format, fit)
+        if image is not None:
+            # Пиксели лежат в отображенном файле, а не в куче - в бюджет памяти не считаем
+            self._put(key, image, 0)
+            return image
+
+        if size is None:
+            image = pygame.image.load(path)
+            image = image.convert_alpha() if pixel_format == FORMAT_ALPHA else image.convert()
+        else:
+            # Исходник тоже кэшируется: смена разрешения не потребует повторного декодирования
+            source = self.load_image(path, None, pixel_format)
+            image = pygame.transform.smoothscale(source, fit_size(source.get_size(), size, fit))
+        self._put(key, image, image.get_pitch() * image.get_height())
+        return image
+
+    # --- Звуки ---
+    def load_sound(self, path):
+        """Возвращает звук pygame.mixer.Sound (декодируется один раз)."""
+        key = self._sound_key(path)
+        sound = self._get(key)
+        if sound is not None:
+            return sound
+
+        future = self._pop_pending(key)
+        if future is not None:
+            return self._finalize(key, future.result())
+
+        sound = pygame.mixer.Sound(path)
+        self._put(key, sound, sound_bytes(sound))
+        return sound
+
+    # --- Фоновая загрузка ---
+    def preload_image(self, path, size=None, pixel_format=FORMAT_ALPHA, fit=FIT_EXACT):
+        """Запускает декодирование (и масштабирование) изображения в рабочем потоке."""
+        key = self._image_key(path, size, pixel_format, fit)
+        if self._archive is not None:
+            image = self._load_from_archive(path, size, pixel_format, fit)
+            if image is not None:
+                # Из архива изображение достается мгновенно, поток не нужен
+                self._put(key, image, 0)
+                return
+            if size is not None:
+                source = self._load_from_archive(path, None, pixel_format, fit)
+                if source is not None:
+                    # Нужного размера в архиве нет - масштабируем исходник из архива в фоне
+                    self._submit(key, _scale_image, source, size, fit)
+                    return
+        self._submit(key, _decode_image, path, size, fit)
+
+    def preload_sound(self, path):
+        """Запускает декодирование звука в рабочем потоке."""
+        self._submit(self._sound_key(path), pygame.mixer.Sound, path)
+
+    def is_loading(self, path):
+        """Грузится ли сейчас в фоне какой-либо вариант ресурса path."""
+        with self._lock:
+            return any(key[1] == path for key in self._pending)
+
+    def pending_count(self):
+        """Количество ресурсов, которые еще грузятся в фоне."""
+        with self._lock:
+            return len(self._pending)
+
+    def poll(self):
+        """
+        Доводит до готовности ресурсы, загруженные в фоне. Вызывается из главного потока
+        каждый кадр. Возвращает количество ресурсов, ставших доступными.
+        """
+        with self._lock:
+            done = [key for key, future in self._pending.items() if future.done()]
+        finished = 0
+        for key in done:
+            future = self._pop_pending(key)
+            if future is None:
+                continue
+            try:
+                self._finalize(key, future.result())
+                finished += 1
+            except (pygame.error, OSError) as e:
+                log.error("assets", "Ошибка фоновой загрузки '%s': %s", key[1], e)
+        return finished
+
+    def _submit(self, key, func, *args):
+        with self._lock:
+            if key in self._entries or key in self._pending:
+                return
+            self._pending[key] = self._get_executor().submit(func, *args)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=LOADER_THREADS,
+                                                    thread_name_prefix="AssetLoader")
+            return self._executor
+
+    def _pop_pending(self, key):
+        with self._lock:
+            return self._pending.pop(key, None)
+
+    def _load_from_archive(self, path, size, pixel_format, fit):
+        """Возвращает изображение из архива или None, если его там нет."""
+        if self._archive is None:
+            return None
+        return self._archive.load_image(archive_key(path, size, pixel_format, fit))
+
+    def _finalize(self, key, asset):
+        """Переводит загруженный в фоне ресурс в итоговый вид и кладет в кэш (главный поток)."""
+        kind, path, size, fit, pixel_format = key
+        if kind == "sound":
+            self._put(key, asset, sound_bytes(asset))
+            return asset
+        decoded, scaled = asset
+        # convert()/convert_alpha() требуют дисплея, поэтому выполняются только здесь
+        image = decoded.convert_alpha() if pixel_format == FORMAT_ALPHA else decoded.convert()
+        if size is not None and not scaled:
+            # Рабочий поток не смог отмасштабировать изображение (например, палитровый PNG)
+            image = pygame.transform.smoothscale(image, fit_size(image.get_size(), size, fit))
+        self._put(key, image, image.get_pitch() * image.get_height())
+        return image
+
+    # --- Управление кэшем ---
+    def release(self, path):
+        """Убирает из кэша все варианты ресурса по пути path."""
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == path]:
+                self.used_bytes -= self._entries.pop(key)[1]
+
+    def clear(self):
+        """Полностью очищает кэш."""
+        with self._lock:
+            self._entries.clear()
+            self.used_bytes = 0
+
+    def stats(self):
+        """Возвращает краткую статистику кэша."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "used_bytes": self.used_bytes,
+                "memory_budget": self.memory_budget,
+            }
+
+    @staticmethod
+    def _image_key(path, size, pixel_format, fit):
+        return ("image", path, tuple(size) if size else None, fit if size else None, pixel_format)
+
+    @staticmethod
+    def _sound_key(path):
+        return ("sound", path, None, None, None)
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            # Ресурс только что использован - переносим в конец очереди LRU
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def _put(self, key, asset, size_bytes):
+        with self._lock:
+            if key in self._entries:
+                self.used_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (asset, size_bytes)
+            self.used_bytes += size_bytes
+            self._evict()
+
+    def _evict(self):
+        """Вытесняет давно не использованные ресурсы, пока не уложимся в бюджет."""
+        # Последний добавленный ресурс не вытесняем, даже если он один больше бюджета
+        while self.used_bytes > self.memory_budget and len(self._entries) > 1:
+            key, (_, size_bytes) = self._entries.popitem(last=False)
+            self.used_bytes -= size_bytes
+            log.debug("assets", "Ресурс вытеснен из кэша: %s %s", key[1], key[2] or '')
+
+def _decode_image(path, size, fit):
+    """
+    Декодирует (и, если возможно, масштабирует) изображение в рабочем потоке.
+    Возвращает (изображение, отмасштабировано ли оно).
+    """
+    image = pygame.image.load(path)
+    if size is not None and image.get_bitsize() in (24, 32):
+        return pygame.transform.smoothscale(image, fit_size(image.get_size(), size, fit)), True
+    return image, False
+
+def _scale_image(image, size, fit):
+    """Масштабирует уже декодированное изображение в рабочем потоке."""
+    return pygame.transform.smoothscale(image, fit_size(image.get_size(), size, fit)), True
+
+def fit_size(source_size, target_size, fit=FIT_EXACT):
+    """Рассчитывает размер изображения после вписывания в target_size."""
+    if fit == FIT_EXACT:
+        return tuple(target_size)
+    img_w, img_h = source_size
+    scale_w = target_size[0] / img_w
+    scale_h = target_size[1] / img_h
+    # cover - больший коэффициент (покрываем экран), contain - меньший (вписываем)
+    scale_factor = max(scale_w, scale_h) if fit == FIT_COVER else min(scale_w, scale_h)
+    return int(img_w * scale_factor), int(img_h * scale_factor)
+
+def sound_bytes(sound):
+    """Оценивает объем памяти, занятый декодированным звуком."""
+    mixer_settings = pygame.mixer.get_init()
+    if not mixer_settings:
+        return 0
+    frequency, sample_format, channels = mixer_settings
+    return int(sound.get_length() * frequency * channels * (abs(sample_format) // 8))
+
+# Общий для всей игры экземпляр
+asset_manager = AssetManager()
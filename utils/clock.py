@@ -0,0 +1,21 @@
+# utils/clock.py
+"""Модуль игрового времени: одно значение на кадр, при повторе ввода - время из записи."""
+
+import pygame
+
+_frame_ticks = None # Время текущего кадра в мс, None - кадр еще не начат
+
+def begin_frame(ticks=None):
+    """
+    Фиксирует время кадра: до следующего вызова get_ticks() возвращает одно значение.
+    При повторе записи ввода сюда передается записанное время (виртуальные часы).
+    """
+    global _frame_ticks
+    _frame_ticks = pygame.time.get_ticks() if ticks is None else ticks
+    return _frame_ticks
+
+def get_ticks():
+    """Миллисекунды с запуска игры - замена pygame.time.get_ticks() для игровой логики."""
+    if _frame_ticks is None:
+        return pygame.time.get_ticks()
+    return _frame_ticks
@@ -0,0 +1,145 @@
+# utils/log.py
+"""Модуль журнала игры с уровнями и категориями."""
+
+import atexit
+import sys
+import threading
+import time
+
+# Уровни сообщений
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+LEVELS_BY_NAME = {name.lower(): level for level, name in LEVEL_NAMES.items()}
+
+LOG_FILE = "game.log"
+RING_BUFFER_SIZE = 2048 # Записи, которые ждут сброса
+FLUSH_INTERVAL = 0.5    # Как часто фоновый поток сбрасывает записи в файл, секунды
+
+class Logger:
+    """
+    Журнал с уровнями и категориями. Вызов log.debug(...) при выключенном уровне
+    стоит одной проверки: сообщение не форматируется, аргументы подставляются
+    (через %) только в фоновом потоке. Записи складываются в кольцевой буфер,
+    фоновый поток сбрасывает их в файл и в консоль - основной цикл не ждет вывода.
+    Если поток не успевает, старые записи перезаписываются (в журнале будет пометка).
+    """
+
+    def __init__(self, capacity=RING_BUFFER_SIZE):
+        self.level = INFO
+        self.category_levels = {} # категория -> свой уровень (например, {"assets": DEBUG})
+        self.console_level = INFO # С какого уровня сообщения дублируются в консоль
+        self.capacity = capacity
+        self._ring = [None] * capacity
+        self._next = 0    # Номер следующей записи
+        self._flushed = 0 # Номер первой еще не сброшенной записи
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._file = None
+
+    def log(self, category, level, message, *args):
+        if level < self.category_levels.get(category, self.level):
+            return
+        record = (time.time(), level, category, message, args)
+        with self._lock:
+            self._ring[self._next % self.capacity] = record
+            self._next += 1
+        if level >= WARNING:
+            self._wake.set() # Ошибки сбрасываем сразу, не дожидаясь интервала
+
+    def debug(self, category, message, *args):
+        if DEBUG >= self.category_levels.get(category, self.level):
+            self.log(category, DEBUG, message, *args)
+
+    def info(self, category, message, *args):
+        self.log(category, INFO, message, *args)
+
+    def warning(self, category, message, *args):
+        self.log(category, WARNING, message, *args)
+
+    def error(self, category, message, *args):
+        self.log(category, ERROR, message, *args)
+
+    # --- Сброс записей ---
+    def start(self, file_path=LOG_FILE):
+        """Запускает фоновый поток сброса. file_path=None - только консоль."""
+        if self._thread is not None:
+            return
+        if file_path:
+            try:
+                self._file = open(file_path, 'a', encoding='utf-8')
+            except OSError as e:
+                self.error("log", "Не удалось открыть журнал '%s': %s", file_path, e)
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="log-flusher", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(FLUSH_INTERVAL)
+            self._wake.clear()
+            self.flush()
+
+    def _take_pending(self):
+        """Забирает еще не сброшенные записи и число потерянных (перезаписанных) записей."""
+        with self._lock:
+            start = max(self._flushed, self._next - self.capacity)
+            lost = start - self._flushed
+            records = [self._ring[i % self.capacity] for i in range(start, self._next)]
+            self._flushed = self._next
+        return records, lost
+
+    def flush(self):
+        """Записывает накопленные сообщения (вызывается фоновым потоком и при выходе)."""
+        records, lost = self._take_pending()
+        if not records and not lost:
+            return
+        lines = []
+        console_lines = []
+        if lost:
+            lines.append(f"... пропущено записей журнала: {lost}")
+        for record in records:
+            line = format_record(record)
+            lines.append(line)
+            if record[1] >= self.console_level:
+                console_lines.append(line)
+        try:
+            if self._file is not None:
+                self._file.write("\n".join(lines) + "\n")
+                self._file.flush()
+            if console_lines:
+                sys.stderr.write("\n".join(console_lines) + "\n")
+                sys.stderr.flush()
+        except (OSError, ValueError):
+            pass # Журнал не должен ронять игру
+
+    def stop(self):
+        """Останавливает фоновый поток и синхронно дописывает оставшиеся записи."""
+        thread = self._thread
+        if thread is not None:
+            self._stopping = True
+            self._wake.set()
+            thread.join()
+            self._thread = None
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+def format_record(record):
+    created, level, category, message, args = record
+    if args:
+        try:
+            message = message % args
+        except (TypeError, ValueError):
+            message = f"{message} {args}"
+    timestamp = time.strftime("%H:%M:%S", time.localtime(created))
+    return f"{timestamp}.{int(created * 1000) % 1000:03d} {LEVEL_NAMES.get(level, level):<7} {category}: {message}"
+
+# Общий для всей игры экземпляр
+log = Logger()
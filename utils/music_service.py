@@ -0,0 +1,123 @@
+# utils/music_service.py
+"""Модуль фоновой музыки с загрузкой в рабочем потоке и плавной сменой треков."""
+
+import os
+import pygame
+from utils.asset_manager import asset_manager
+from utils.log import log
+
+MUSIC_CHANNELS = 2 # Два канала: один трек затухает, другой нарастает
+DEFAULT_CROSSFADE_MS = 1500
+
+class MusicService:
+    """
+    Музыка играет как pygame.mixer.Sound на двух зарезервированных каналах,
+    поэтому при смене сцены треки можно плавно смешать (crossfade).
+    Трек декодируется в рабочем потоке (asset_manager) - заранее через preload()
+    или при первом play(); пока он грузится, основной цикл не ждет, трек начнется
+    сам, как только загрузится. Затухание и нарастание выполняет SDL_mixer.
+    """
+
+    def __init__(self, crossfade_ms=DEFAULT_CROSSFADE_MS):
+        self.crossfade_ms = crossfade_ms
+        self.volume = 1.0
+        self._channels = []
+        self._active = 0 # Индекс канала, на котором играет (или начнет играть) текущий трек
+        self.current_track = None
+        self._pending = None # (путь, длительность смешивания, повторы) - ждет загрузки
+        self._fade_deadline = 0 # pygame.time.get_ticks(), когда закончится текущее смешивание
+        # Громкость сменили во время смешивания: SDL_mixer перезапишет её в конце нарастания
+        self._reapply_volume = False
+
+    def setup(self, channel_ids):
+        """Получает зарезервированные каналы (см. sound_manager.setup(extra_reserved=...))."""
+        self._channels = [pygame.mixer.Channel(i) for i in channel_ids]
+
+    @property
+    def available(self):
+        return len(self._channels) >= MUSIC_CHANNELS
+
+    def preload(self, path):
+        """Заранее запускает декодирование трека в фоне (например, при входе в сцену)."""
+        if not os.path.exists(path):
+            log.warning("audio", "Файл музыки '%s' не найден.", path)
+            return False
+        asset_manager.preload_sound(path)
+        return True
+
+    def is_loading(self):
+        """Ждет ли трек загрузки."""
+        return self._pending is not None
+
+    def needs_update(self):
+        """Нужно ли основному циклу продолжать вызывать update (трек грузится или идет смешивание)."""
+        return self._pending is not None or self._reapply_volume
+
+    def play(self, path, fade_ms=None, loops=-1):
+        """
+        Плавно переключается на трек path. Если он уже играет - ничего не делает.
+        Если трек еще грузится, он начнется в update() после загрузки.
+        """
+        if not self.available:
+            return
+        if path == self.current_track and self._pending is None:
+            return
+        if not self.preload(path):
+            return
+        self.current_track = path
+        self._pending = (path, self.crossfade_ms if fade_ms is None else fade_ms, loops)
+        self.update()
+
+    def stop(self, fade_ms=None):
+        """Плавно останавливает музыку."""
+        self._pending = None
+        self.current_track = None
+        fade_ms = self.crossfade_ms if fade_ms is None else fade_ms
+        for channel in self._channels:
+            if fade_ms > 0:
+                channel.fadeout(fade_ms)
+            else:
+                channel.stop()
+
+    def update(self):
+        """Вызывается каждый кадр: запускает трек, как только он загрузился."""
+        if self._reapply_volume and pygame.time.get_ticks() >= self._fade_deadline:
+            # Нарастание закончилось и вернуло каналу прежнюю громкость - ставим новую
+            self._reapply_volume = False
+            self._channels[self._active].set_volume(self.volume)
+        if self._pending is None:
+            return
+        path, fade_ms, loops = self._pending
+        if asset_manager.is_loading(path):
+            return # Звук будет готов после asset_manager.poll()
+        self._pending = None
+        try:
+            sound = asset_manager.load_sound(path) # Уже в кэше, не блокирует
+        except (pygame.error, FileNotFoundError) as e:
+            log.error("audio", "Ошибка загрузки музыки '%s': %s", path, e)
+            self.current_track = None
+            return
+        old_channel = self._channels[self._active]
+        self._active = (self._active + 1) % len(self._channels)
+        new_channel = self._channels[self._active]
+        # Громкость канала задается до play: нарастание идет от нуля до неё
+        new_channel.set_volume(self.volume)
+        new_channel.play(sound, loops, fade_ms=fade_ms)
+        self._fade_deadline = pygame.time.get_ticks() + fade_ms
+        self._reapply_volume = False
+        if fade_ms > 0:
+            old_channel.fadeout(fade_ms)
+        else:
+            old_channel.stop()
+
+    def set_volume(self, volume):
+        """Громкость музыки (из apply_volume_settings)."""
+        self.volume = volume
+        # Оба канала: затухающий трек тоже должен звучать с новой громкостью
+        for channel in self._channels:
+            channel.set_volume(volume)
+        if self._channels and pygame.time.get_ticks() < self._fade_deadline:
+            self._reapply_volume = True
+
+# Общий для всей игры экземпляр
+music_service = MusicService()
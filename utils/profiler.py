@@ -0,0 +1,141 @@
+# utils/profiler.py
+"""Модуль для замера времени кадра по фазам основного цикла."""
+
+import csv
+from array import array
+from time import perf_counter
+from utils.log import log
+
+# Фазы кадра в порядке их выполнения в основном цикле
+PHASES = ("events", "update", "draw", "flip", "tick")
+# Время всего кадра без ожидания в clock.tick (сколько кадр реально работал)
+FRAME = "frame"
+WORK_PHASES = PHASES[:-1]
+DEFAULT_CAPACITY = 600 # Последние 10 секунд при 60 FPS
+PERCENTILES = (50, 95, 99)
+
+class RingBuffer:
+    """Кольцевой буфер фиксированного размера для замеров (в секундах)."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.samples = array('d', bytes(8 * capacity))
+        self.index = 0 # Куда будет записан следующий замер
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, value):
+        self.samples[self.index] = value
+        self.index = (self.index + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def values(self):
+        """Замеры от самого старого к самому новому."""
+        if self.count < self.capacity:
+            return self.samples[:self.count].tolist()
+        return (self.samples[self.index:] + self.samples[:self.index]).tolist()
+
+def percentile(sorted_values, percent):
+    """Перцентиль по рангу (без интерполяции) из отсортированного списка."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+class FrameProfiler:
+    """
+    Замеряет фазы каждого кадра отдельно для каждой сцены. Основной цикл вызывает
+    begin_frame(), затем mark(фаза) после каждой фазы и end_frame() в конце кадра.
+    Пока профилировщик выключен, эти вызовы сразу возвращаются.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.enabled = False
+        self._buffers = {} # сцена -> {фаза: RingBuffer}
+        self.worst = {}    # сцена -> (время кадра, {фаза: время}) самого медленного кадра
+        self._scene = None
+        self._frame = None # {фаза: время} текущего кадра, None - кадр не замеряется
+        self._last = 0.0
+
+    @property
+    def scenes(self):
+        return list(self._buffers)
+
+    def begin_frame(self, scene_id):
+        if not self.enabled:
+            return
+        self._scene = scene_id
+        self._frame = dict.fromkeys(PHASES, 0.0)
+        self._last = perf_counter()
+
+    def mark(self, phase):
+        """Засчитывает время с прошлой отметки в фазу phase."""
+        if self._frame is None:
+            return
+        now = perf_counter()
+        self._frame[phase] += now - self._last
+        self._last = now
+
+    def end_frame(self):
+        frame = self._frame
+        if frame is None:
+            return
+        self._frame = None
+        buffers = self._buffers.get(self._scene)
+        if buffers is None:
+            buffers = {phase: RingBuffer(self.capacity) for phase in PHASES + (FRAME,)}
+            self._buffers[self._scene] = buffers
+        total = sum(frame[phase] for phase in WORK_PHASES)
+        for phase, value in frame.items():
+            buffers[phase].append(value)
+        buffers[FRAME].append(total)
+        worst = self.worst.get(self._scene)
+        if worst is None or total > worst[0]:
+            self.worst[self._scene] = (total, frame)
+
+    def history(self, scene_id, phase=FRAME):
+        """Последние замеры фазы для сцены (в секундах, от старых к новым)."""
+        buffers = self._buffers.get(scene_id)
+        return buffers[phase].values() if buffers else []
+
+    def stats(self, scene_id):
+        """
+        Статистика по сцене: {фаза: (число замеров, среднее, p50, p95, p99, максимум)},
+        время в секундах. Включает FRAME - время кадра без ожидания.
+        """
+        result = {}
+        for phase, buffer in self._buffers.get(scene_id, {}).items():
+            values = sorted(buffer.values())
+            if not values:
+                continue
+            result[phase] = (len(values), sum(values) / len(values),
+                             *(percentile(values, p) for p in PERCENTILES), values[-1])
+        return result
+
+    def reset(self):
+        self._buffers.clear()
+        self.worst.clear()
+        self._frame = None
+
+    def write_csv(self, file_path):
+        """Записывает статистику по всем сценам в CSV (время в миллисекундах)."""
+        try:
+            with open(file_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(["scene", "phase", "samples", "mean_ms", "p50_ms", "p95_ms",
+                                 "p99_ms", "max_ms", "worst_frame_ms"])
+                for scene_id in self._buffers:
+                    worst_total, worst_frame = self.worst.get(scene_id, (0.0, {}))
+                    for phase, (count, *times) in self.stats(scene_id).items():
+                        worst_value = worst_total if phase == FRAME else worst_frame.get(phase, 0.0)
+                        writer.writerow([scene_id, phase, count] +
+                                        [f"{value * 1000:.3f}" for value in times + [worst_value]])
+        except OSError as e:
+            log.error("profiler", "Ошибка записи статистики кадров '%s': %s", file_path, e)
+
+# Общий для всей игры экземпляр
+profiler = FrameProfiler()
@@ -0,0 +1,103 @@
+# utils/replay.py
+"""Модуль записи ввода и его точного повтора."""
+
+import marshal
+import pygame
+from utils.log import log
+
+REPLAY_MAGIC = "game-input-log"
+REPLAY_VERSION = 1
+# Типы значений, которые marshal записывает без потерь
+_PLAIN_TYPES = (int, float, str, bytes, bool, type(None))
+
+def _plain_value(value):
+    """Приводит атрибут события к виду, пригодному для marshal, или возвращает None."""
+    if isinstance(value, _PLAIN_TYPES):
+        return value
+    if isinstance(value, (tuple, list)) and all(isinstance(item, _PLAIN_TYPES) for item in value):
+        return tuple(value)
+    return None
+
+def pack_event(event):
+    """Событие pygame -> (тип, {атрибут: значение}). Несериализуемые атрибуты (окно) отбрасываются."""
+    attributes = {}
+    for key, value in event.dict.items():
+        plain = _plain_value(value)
+        if plain is not None or value is None:
+            attributes[key] = plain
+    return event.type, attributes
+
+def unpack_event(packed):
+    event_type, attributes = packed
+    return pygame.event.Event(event_type, attributes)
+
+class InputRecorder:
+    """
+    Пишет поток ввода покадрово: (номер кадра, время кадра, позиция мыши, события).
+    Каждый кадр - отдельная запись marshal, поэтому лог читается даже после аварийного выхода.
+    """
+
+    def __init__(self, file_path, start_ticks, info=None):
+        self.file_path = file_path
+        self.frame = 0
+        self._file = open(file_path, 'wb')
+        marshal.dump((REPLAY_MAGIC, REPLAY_VERSION, start_ticks, info or {}), self._file)
+
+    def record_frame(self, ticks, mouse_pos, events):
+        marshal.dump((self.frame, ticks, tuple(mouse_pos), tuple(pack_event(event) for event in events)),
+                     self._file)
+        self.frame += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            log.info("replay", "Запись ввода сохранена в '%s' (%d кадров).", self.file_path, self.frame)
+
+class InputReplayer:
+    """Читает лог InputRecorder и отдает кадры по порядку."""
+
+    def __init__(self, file_obj, start_ticks, info):
+        self._file = file_obj
+        self.start_ticks = start_ticks
+        self.info = info
+        self.frame = 0
+
+    @classmethod
+    def open(cls, file_path):
+        """Открывает лог. Возвращает None, если файл не найден или это не лог ввода."""
+        try:
+            file_obj = open(file_path, 'rb')
+        except OSError as e:
+            log.error("replay", "Не удалось открыть запись ввода '%s': %s", file_path, e)
+            return None
+        try:
+            magic, version, start_ticks, info = marshal.load(file_obj)
+        except (EOFError, ValueError, TypeError):
+            magic, version = None, None
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            log.error("replay", "Файл '%s' не является записью ввода этой версии.", file_path)
+            file_obj.close()
+            return None
+        return cls(file_obj, start_ticks, info)
+
+    def next_frame(self):
+        """Возвращает (время кадра, позиция мыши, события) или None, когда запись закончилась."""
+        if self._file is None:
+            return None
+        try:
+            frame, ticks, mouse_pos, packed_events = marshal.load(self._file)
+        except (EOFError, ValueError, TypeError):
+            self.close()
+            return None
+        if frame != self.frame:
+            log.error("replay", "Запись ввода повреждена: ожидался кадр %d, получен %d.", self.frame, frame)
+            self.close()
+            return None
+        self.frame += 1
+        return ticks, mouse_pos, [unpack_event(packed) for packed in packed_events]
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
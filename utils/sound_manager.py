@@ -0,0 +1,155 @@
+# utils/sound_manager.py
+"""Модуль воспроизведения звуковых эффектов через пулы каналов микшера."""
+
+import itertools
+import pygame
+from utils.asset_manager import asset_manager
+from utils.log import log
+
+# Параметры микшера: pre_init нужно вызвать до pygame.init(), иначе они не действуют
+MIXER_FREQUENCY = 44100
+MIXER_SIZE = -16      # 16 бит со знаком
+MIXER_CHANNELS = 2    # Стерео
+MIXER_BUFFER = 512    # Маленький буфер - короткая задержка звука
+FREE_CHANNELS = 8     # Каналы вне пулов (для pygame.mixer.find_channel)
+
+# Категории звуков
+CATEGORY_UI = "ui"
+CATEGORY_COMBAT = "combat"
+CATEGORY_AMBIENCE = "ambience"
+
+# Группы громкости (берутся из настроек sfx_volume / music_volume)
+GROUP_SFX = "sfx"
+GROUP_MUSIC = "music"
+
+# Что делать, если все каналы пула заняты
+STEAL_OLDEST = "oldest"     # Прервать самый старый звук
+STEAL_PRIORITY = "priority" # Прервать звук с меньшим приоритетом (при равном - самый старый)
+STEAL_NONE = "none"         # Не прерывать, новый звук не играет
+
+# Категория -> (число каналов, правило вытеснения, группа громкости)
+CHANNEL_POOLS = {
+    CATEGORY_UI: (2, STEAL_OLDEST, GROUP_SFX),
+    CATEGORY_COMBAT: (8, STEAL_PRIORITY, GROUP_SFX),
+    CATEGORY_AMBIENCE: (2, STEAL_NONE, GROUP_SFX),
+}
+
+def pre_init_mixer():
+    """Настраивает микшер на низкую задержку. Вызывать до pygame.init()."""
+    pygame.mixer.pre_init(MIXER_FREQUENCY, MIXER_SIZE, MIXER_CHANNELS, MIXER_BUFFER)
+
+class ChannelPool:
+    """Зарезервированные каналы одной категории и звуки, которые на них играют."""
+
+    def __init__(self, category, channel_ids, steal_policy, group):
+        self.category = category
+        self.channels = [pygame.mixer.Channel(i) for i in channel_ids]
+        # Для каждого канала: (порядковый номер запуска, приоритет, громкость) или None
+        self.voices = [None] * len(self.channels)
+        self.steal_policy = steal_policy
+        self.group = group
+
+    def acquire(self, priority):
+        """Возвращает индекс канала для нового звука или None, если звук играть не должен."""
+        for index, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return index
+        if self.steal_policy == STEAL_NONE:
+            return None
+        if self.steal_policy == STEAL_OLDEST:
+            return min(range(len(self.voices)), key=lambda i: self.voices[i][0])
+        # STEAL_PRIORITY: самый неважный (затем самый старый) звук, но не важнее нового
+        index = min(range(len(self.voices)), key=lambda i: (self.voices[i][1], self.voices[i][0]))
+        return index if self.voices[index][1] <= priority else None
+
+class SoundManager:
+    """
+    Звуковые эффекты: каждый файл декодируется в PCM один раз (кэш asset_manager),
+    у каждой категории свой пул зарезервированных каналов, громкость группы
+    применяется к каналам, сами звуки не меняются.
+    """
+
+    def __init__(self, pools=CHANNEL_POOLS):
+        self._pool_config = pools
+        self._pools = {}
+        self._group_volumes = {GROUP_SFX: 1.0, GROUP_MUSIC: 1.0}
+        self._order = itertools.count()
+        self.extra_channel_ids = range(0) # Зарезервированные каналы вне пулов (см. setup)
+        self.available = False
+
+    def setup(self, extra_reserved=0):
+        """
+        Создает пулы каналов (после pygame.init()). extra_reserved - сколько
+        каналов зарезервировать сверх пулов (их номера идут после каналов пулов).
+        """
+        if pygame.mixer.get_init() is None:
+            log.warning("audio", "Микшер не инициализирован, звуки воспроизводиться не будут.")
+            return
+        total = sum(count for count, _, _ in self._pool_config.values())
+        pygame.mixer.set_num_channels(total + extra_reserved + FREE_CHANNELS)
+        pygame.mixer.set_reserved(total + extra_reserved)
+        next_id = 0
+        for category, (count, steal_policy, group) in self._pool_config.items():
+            self._pools[category] = ChannelPool(category, range(next_id, next_id + count), steal_policy, group)
+            next_id += count
+        self.extra_channel_ids = range(total, total + extra_reserved)
+        self.available = True
+
+    # --- Загрузка ---
+    def preload(self, path):
+        """Запускает декодирование звука в фоне."""
+        asset_manager.preload_sound(path)
+
+    def get_sound(self, path):
+        """Звук из кэша; None, если он еще декодируется в фоне или не загрузился."""
+        if asset_manager.is_loading(path):
+            return None
+        try:
+            return asset_manager.load_sound(path)
+        except (pygame.error, FileNotFoundError) as e:
+            log.error("audio", "Ошибка загрузки звука '%s': %s", path, e)
+            return None
+
+    # --- Воспроизведение ---
+    def play(self, sound, category=CATEGORY_UI, volume=1.0, priority=0, loops=0):
+        """
+        Проигрывает звук (pygame.mixer.Sound или путь к файлу) в пуле категории.
+        Возвращает канал или None, если звук не загружен или пул занят.
+        """
+        pool = self._pools.get(category)
+        if pool is None:
+            return None
+        if isinstance(sound, str):
+            sound = self.get_sound(sound)
+            if sound is None:
+                return None
+        index = pool.acquire(priority)
+        if index is None:
+            log.debug("audio", "Пул '%s' занят, звук пропущен.", category)
+            return None
+        channel = pool.channels[index]
+        channel.set_volume(volume * self._group_volumes[pool.group])
+        channel.play(sound, loops)
+        pool.voices[index] = (next(self._order), priority, volume)
+        return channel
+
+    def stop(self, category):
+        """Останавливает все звуки категории."""
+        pool = self._pools.get(category)
+        if pool is not None:
+            for channel in pool.channels:
+                channel.stop()
+
+    # --- Громкость ---
+    def set_group_volume(self, group, volume):
+        """Меняет громкость группы, в том числе у уже играющих звуков."""
+        self._group_volumes[group] = volume
+        for pool in self._pools.values():
+            if pool.group != group:
+                continue
+            for channel, voice in zip(pool.channels, pool.voices):
+                if voice is not None and channel.get_busy():
+                    channel.set_volume(voice[2] * volume)
+
+# Общий для всей игры экземпляр
+sound_manager = SoundManager()
@@ -0,0 +1,106 @@
+# utils/video_decoder.py
+"""Модуль для фонового декодирования видео в кольцевой буфер кадров."""
+
+import threading
+from collections import deque
+import queue
+import pygame
+from utils.log import log
+
+class VideoFrameDecoder:
+    """
+    Декодирует кадры клипа MoviePy в отдельном потоке.
+    Кадры пишутся в заранее созданные поверхности размера target_size,
+    поток воспроизведения только забирает готовые кадры и никогда не ждет декодер.
+    """
+
+    def __init__(self, clip, target_size, buffer_size=4):
+        self.clip = clip
+        self.fps = clip.fps
+        self.frame_count = int(clip.duration * clip.fps)
+        self.target_size = target_size
+
+        # smoothscale пишет только в поверхность формата исходного кадра (24 бита RGB),
+        # поэтому масштабирование идет в промежуточную поверхность этого формата
+        frame_w, frame_h = clip.size
+        template = pygame.image.frombuffer(bytes(frame_w * frame_h * 3), (frame_w, frame_h), "RGB")
+        self._scaled = pygame.Surface(target_size, 0, template)
+        # Слоты - в формате дисплея: пиксели переводятся в потоке декодера,
+        # а blit кадра на экран в основном потоке идет без конвертации
+        has_display = pygame.display.get_surface() is not None
+        self._free_slots = queue.Queue()
+        for _ in range(buffer_size):
+            slot = pygame.Surface(target_size, 0, template)
+            self._free_slots.put(slot.convert() if has_display else slot)
+
+        self._ready = deque() # (индекс кадра, поверхность) в порядке декодирования
+        self._lock = threading.Lock()
+        self._current = None # Кадр, который сейчас на экране
+        # Индекс кадра, который нужен воспроизведению: декодер не тратит время на опоздавшие кадры
+        self._playback_index = 0
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="VideoFrameDecoder", daemon=True)
+
+    def start(self, elapsed_ms=0):
+        """Запускает поток декодирования с кадра, соответствующего elapsed_ms."""
+        self._playback_index = int(elapsed_ms * self.fps / 1000)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Останавливает поток декодирования и дожидается его завершения
+        (без тайм-аута: после stop() клип закрывают, поток не должен его читать).
+        """
+        self._stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self):
+        """Цикл потока: декодирует кадры, пока есть свободные слоты."""
+        frame_w, frame_h = self.clip.size
+        index = 0
+        while not self._stop_event.is_set():
+            try:
+                slot = self._free_slots.get(timeout=0.05)
+            except queue.Empty:
+                continue
+
+            # Пропускаем кадры, время которых уже прошло
+            index = max(index, self._playback_index)
+            if index >= self.frame_count:
+                self._free_slots.put(slot)
+                break
+
+            try:
+                frame = self.clip.get_frame(index / self.fps)
+            except Exception as e:
+                log.error("video", "Ошибка декодирования кадра видео %d: %s", index, e)
+                self._free_slots.put(slot)
+                break
+
+            # Кадр MoviePy (высота, ширина, RGB) уже лежит в памяти построчно,
+            # поэтому поверхность создается поверх его буфера без транспонирования и копирования
+            source = pygame.image.frombuffer(frame, (frame_w, frame_h), "RGB")
+            if source.get_size() != self.target_size:
+                source = pygame.transform.smoothscale(source, self.target_size, self._scaled)
+            slot.blit(source, (0, 0))
+
+            with self._lock:
+                self._ready.append((index, slot))
+            index += 1
+
+    def get_frame(self, elapsed_ms):
+        """
+        Возвращает поверхность кадра для момента elapsed_ms (или None, если кадров еще нет).
+        Опоздавшие кадры пропускаются, вместо ожидания показывается последний готовый.
+        """
+        target_index = int(elapsed_ms * self.fps / 1000)
+        self._playback_index = target_index
+        with self._lock:
+            while self._ready and self._ready[0][0] <= target_index:
+                frame = self._ready.popleft()
+                if self._current is not None:
+                    # Предыдущий кадр больше не показывается - возвращаем слот декодеру
+                    self._free_slots.put(self._current[1])
+                self._current = frame
+        return self._current[1] if self._current else None